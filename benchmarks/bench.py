@@ -0,0 +1,190 @@
+"""
+Benchmarks of mapineqpy against the bundled mock server.
+
+Measures throughput, latency percentiles, peak memory and bytes on the wire of single, bulk, cached
+and concurrent data requests, without touching the live API. Results can be saved as JSON and compared with a baseline to
+catch regressions:
+
+    python benchmarks/bench.py --save baseline.json
+    python benchmarks/bench.py --compare baseline.json --tolerance 0.25
+
+The exit status is 1 when a benchmark is slower than the baseline by more than the tolerance.
+
+The server runs in the same process, so timings include generating the responses. Use `--latency`
+to model network round trips, which is where concurrency pays off.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _measure(func, repeat):
+    """
+    Run `func` `repeat` times and return timings, rows per second, peak traced memory and the bytes
+    received per run, decompressed and on the wire.
+    """
+    func()  # Warm-up: connections, imports, memoized metadata
+    timings, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows += func()
+        timings.append(time.perf_counter() - start)
+    # Memory is traced in a separate run, tracing slows everything down too much to be timed
+    tracemalloc.start()
+    with mi.collect_stats() as stats:
+        func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    summary = stats.summary()
+    return {
+        "mean_s": statistics.mean(timings),
+        "p50_s": _percentile(timings, 50),
+        "p90_s": _percentile(timings, 90),
+        "p99_s": _percentile(timings, 99),
+        "rows_per_s": rows / sum(timings),
+        "peak_mb": peak / 2**20,
+        "body_kb": summary["bytes"] / 2**10,
+        "wire_kb": summary["wire_bytes"] / 2**10,
+    }
+
+
+def _spec(year, category="C0", source="SRC000"):
+    return {"x_source": source, "year": year, "level": "3", "x_filters": {"category": category}}
+
+
+def run(args):
+    server = MockServer(
+        n_regions=args.regions,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    results = {}
+    with server, tempfile.TemporaryDirectory() as cache_dir:
+        client = server.client()
+        mi.options["retries"] = 5
+        mi.options["backoff_factor"] = 0
+
+        def single():
+            return len(client.data(**_spec(2020), limit=None))
+
+        def metadata():
+            # Memoized metadata would make this a dictionary lookup
+            mi.clear_metadata_cache()
+            return sum(
+                len(client.source_filters(source, year=2020, level="3")) for source in server.sources
+            )
+
+        def bulk():
+            specs = [
+                dict(_spec(2010 + i % 11, source=f"SRC{i % 4:03d}"), limit=None) for i in range(args.bulk)
+            ]
+            return sum(len(df) for df in mi.data_many(specs, client=client))
+
+        def cached():
+            return len(client.data(**_spec(2019), limit=None))
+
+        def concurrent():
+            async def gather():
+                tasks = [
+                    mi.adata(**_spec(2010 + i % 11, category=f"C{i % 3}"), limit=None, client=client)
+                    for i in range(args.bulk)
+                ]
+                return await asyncio.gather(*tasks)
+
+            return sum(len(df) for df in asyncio.run(gather()))
+
+        def streamed():
+            return sum(len(chunk) for chunk in client.iter_data(**_spec(2018), page_size=args.page_size))
+
+        results["single"] = _measure(single, args.repeat)
+        results["metadata"] = _measure(metadata, args.repeat)
+        results["bulk"] = _measure(bulk, args.repeat)
+        results["concurrent"] = _measure(concurrent, args.repeat)
+        results["iter_data"] = _measure(streamed, args.repeat)
+
+        saved = {key: mi.options[key] for key in ("cache", "cache_dir")}
+        mi.options.update(cache=True, cache_dir=cache_dir)
+        try:
+            results["cached"] = _measure(cached, args.repeat)
+        finally:
+            mi.options.update(saved)
+        client.close()
+        results["_requests"] = dict(server.requests)
+    return results
+
+
+def report(results, baseline=None, tolerance=0.25):
+    """
+    Print a results table and return the names of benchmarks that regressed against `baseline`.
+    """
+    header = f"{'benchmark':<22}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'rows/s':>12}{'peak MB':>10}{'wire KB':>10}"
+    print(header)
+    print("-" * len(header))
+    regressions = []
+    for name, r in results.items():
+        if name.startswith("_"):
+            continue
+        line = (
+            f"{name:<22}{r['mean_s'] * 1000:>10.1f}{r['p50_s'] * 1000:>10.1f}{r['p90_s'] * 1000:>10.1f}"
+            f"{r['p99_s'] * 1000:>10.1f}{r['rows_per_s']:>12.0f}{r['peak_mb']:>10.1f}"
+            f"{r.get('wire_kb', float('nan')):>10.0f}"
+        )
+        if baseline and name in baseline:
+            change = r["p50_s"] / baseline[name]["p50_s"] - 1
+            line += f"  {change:+.0%}"
+            if change > tolerance:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+    print(f"\nRequests served: {results.get('_requests', {})}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--regions", type=int, default=2000, help="Regions per NUTS level (rows per query).")
+    parser.add_argument("--bulk", type=int, default=16, help="Queries per bulk and concurrent run.")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per benchmark.")
+    parser.add_argument("--page-size", type=int, default=500, help="Page size of the iter_data benchmark.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server latency per request in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 503.")
+    parser.add_argument("--no-compression", action="store_true", help="Request uncompressed responses.")
+    parser.add_argument("--geo-lookup", action="store_true", help="Store region metadata in the shared lookup.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare the results with.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown of the median.")
+    args = parser.parse_args(argv)
+    mi.options["compression"] = not args.no_compression
+    mi.options["geo_metadata"] = "lookup" if args.geo_lookup else "columns"
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    regressions = report(results, baseline, args.tolerance)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Check the import time of mapineqpy against a budget.
+
+Each measurement runs in a fresh interpreter. The check fails (exit status 1) when the fastest
+`import mapineqpy` exceeds the budget, or when importing the package or looking up a public name
+imports pandas or requests.
+
+    python benchmarks/import_time.py --budget-ms 30
+
+The same checks run in the test suite, see tests/test_import.py.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import mapineqpy as mi
+elapsed = time.perf_counter() - started
+loaded = [name for name in ("pandas", "requests") if name in sys.modules]
+mi.nuts_levels, mi.options, mi.MapineqClient
+loaded_after_lookup = [name for name in ("pandas", "requests") if name in sys.modules]
+print(json.dumps({"seconds": elapsed, "loaded": loaded, "loaded_after_lookup": loaded_after_lookup}))
+"""
+
+
+def measure(repeat):
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE], check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=30.0, help="Maximum import time in milliseconds.")
+    parser.add_argument("--repeat", type=int, default=7, help="Number of fresh interpreters to measure.")
+    args = parser.parse_args(argv)
+
+    results = measure(args.repeat)
+    best = min(r["seconds"] for r in results) * 1000
+    print(f"import mapineqpy: {best:.1f} ms (best of {args.repeat}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if best > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    loaded = results[0]["loaded"]
+    if loaded:
+        print(f"FAIL: `import mapineqpy` imported {', '.join(loaded)}")
+        failed = True
+    loaded = results[0]["loaded_after_lookup"]
+    if loaded:
+        print(f"FAIL: looking up nuts_levels, options and MapineqClient imported {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
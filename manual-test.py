@@ -15,25 +15,23 @@ client = mi.MapineqClient()
 
 
 
-levels = client.get_levels()
+levels = client.nuts_levels()
 print(levels)  # Should return a list like ["0", "1", "2", "3"]
 
-sources = mi.get_sources(client, level="2", limit=5)
+sources = client.sources(level="2", limit=5)
 print(sources)  # Should print a list of sources for NUTS level 2
 
-coverage = mi.source_coverage(client, source_name="BD_HGNACE2_R3", limit=2500)
+coverage = mi.source_coverage(source_name="BD_HGNACE2_R3", limit=2500, client=client)
 print(coverage)
 
-filters = mi.fetch_filter_options(
-    client, 
+filters = client.source_filters(
     source_name="DEMO_R_FIND2", 
     year=2020, 
     level="2"
 )
 print(filters)  # Should return possible filter values
 
-univariate_data = mi.fetch_univariate_data(
-    client, 
+univariate_data = client.data(
     x_source="TGS00010", 
     year=2020, 
     level="2", 
@@ -42,8 +40,7 @@ univariate_data = mi.fetch_univariate_data(
 print(univariate_data)  # Should print univariate data points
 
 
-bivariate_data = mi.fetch_bivariate_data(
-    client, 
+bivariate_data = client.data(
     x_source="TGS00010", 
     y_source="DEMO_R_MLIFEXP", 
     year=2020, 
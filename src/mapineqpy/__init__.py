@@ -1,15 +1,105 @@
 # src/mapineqpy/__init__.py
 
-from .levels import nuts_levels
-from .sources import sources, source_coverage
-from .source_filters import source_filters
-from .data import data
+# Public names are imported from their submodules on first access, so that `import mapineqpy`
+# does not pay for importing pandas and requests until they are needed.
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING
+
 from .options import options
 
-__all__ = [
-    "nuts_levels",
-    "sources",
-    "source_coverage",
-    "source_filters",
-    "data",
-]
+if TYPE_CHECKING:
+    from . import catalog, instrument
+    from .cache import cache_info, clear_cache
+    from .client import MapineqClient, get_client, set_client
+    from .combinations import data_combinations, expand_filters
+    from .concurrency import adata, anuts_levels, asource_coverage, asource_filters, asources, data_many
+    from .concurrency import source_filters_many
+    from .data import data, find_duplicates, iter_data
+    from .export import export
+    from .geo import clear_geo_lookup, geo_lookup
+    from .instrument import Stats, add_hook, collect_stats, remove_hook
+    from .levels import nuts_levels
+    from .memo import clear_metadata_cache
+    from .output import convert_output
+    from .panel import panel
+    from .planner import QueryPlan, plan
+    from .retry import RateLimiter, RetryPolicy
+    from .snapshot import Snapshot, record_snapshot
+    from .source_filters import source_filters
+    from .sources import source_coverage, sources
+
+# Public name -> submodule defining it
+_ATTRIBUTES = {
+    "MapineqClient": "client",
+    "get_client": "client",
+    "set_client": "client",
+    "RetryPolicy": "retry",
+    "RateLimiter": "retry",
+    "nuts_levels": "levels",
+    "sources": "sources",
+    "source_coverage": "sources",
+    "source_filters": "source_filters",
+    "data": "data",
+    "iter_data": "data",
+    "find_duplicates": "data",
+    "anuts_levels": "concurrency",
+    "asources": "concurrency",
+    "asource_coverage": "concurrency",
+    "asource_filters": "concurrency",
+    "adata": "concurrency",
+    "data_many": "concurrency",
+    "source_filters_many": "concurrency",
+    "panel": "panel",
+    "plan": "planner",
+    "QueryPlan": "planner",
+    "convert_output": "output",
+    "expand_filters": "combinations",
+    "data_combinations": "combinations",
+    "export": "export",
+    "geo_lookup": "geo",
+    "clear_geo_lookup": "geo",
+    "clear_cache": "cache",
+    "cache_info": "cache",
+    "clear_metadata_cache": "memo",
+    "record_snapshot": "snapshot",
+    "Snapshot": "snapshot",
+    "add_hook": "instrument",
+    "remove_hook": "instrument",
+    "collect_stats": "instrument",
+    "Stats": "instrument",
+}
+
+# Submodules exposed as namespaces, e.g. `mi.catalog.build()`
+_SUBMODULES = {"catalog", "instrument"}
+
+__all__ = list(_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES) | _SUBMODULES)
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package. `data`, `export`, `panel` and `source_filters`
+        # are both submodules and functions, and `mi.data` must stay the function.
+        if isinstance(value, types.ModuleType) and name in _ATTRIBUTES:
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,5 @@
+import sys
+
+from mapineqpy.cli import main
+
+sys.exit(main())
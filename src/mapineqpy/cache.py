@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from mapineqpy.options import options
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def default_cache_dir():
+    """
+    Return the default directory of the on-disk cache.
+
+    This is `$XDG_CACHE_HOME/mapineqpy` if the variable is set, otherwise `~/.cache/mapineqpy`.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mapineqpy")
+
+
+def cache_key(url, params=None):
+    """
+    Build a cache key from an endpoint URL and its query parameters.
+
+    Parameters are sorted by name, so the key does not depend on the order they were given in.
+    """
+    params = params or {}
+    normalized = [url, sorted((str(k), str(v)) for k, v in params.items())]
+    return hashlib.sha256(
+        json.dumps(normalized, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent cache of raw API response bodies stored in an SQLite database.
+
+    Bodies are stored zlib-compressed. Entries expire after a per-endpoint time to live, and
+    the least recently used entries are evicted once the total stored size exceeds `max_size`.
+
+    Args:
+        cache_dir (str): Directory holding the cache database. Created if it does not exist.
+        max_size (int, optional): Maximum total size of stored bodies in bytes. None for no limit.
+    """
+
+    def __init__(self, cache_dir, max_size=None):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "responses.sqlite")
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " function_name TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " body BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, key, ttl=None):
+        """
+        Return the cached body for `key`, or None if it is missing or older than `ttl` seconds.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            created, body = row
+            if ttl is not None and now - created > ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return zlib.decompress(body)
+
+    def set(self, key, function_name, body):
+        """
+        Store a raw response body under `key`, evicting old entries if the cache is over size.
+        """
+        now = time.time()
+        compressed = zlib.compress(body)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, function_name, created, accessed, size, body)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, function_name, now, now, len(compressed), compressed),
+            )
+            if self.max_size is not None:
+                self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def clear(self, function_name=None):
+        """
+        Remove all entries, or only those of one API function.
+        """
+        with self._lock:
+            if function_name is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE function_name = ?", (function_name,))
+            self._conn.execute("VACUUM")
+
+    def info(self):
+        """
+        Return a dictionary with the location, number of entries and total size of the cache.
+        """
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"path": self.path, "entries": count, "size": size, "max_size": self.max_size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_cache():
+    """
+    Return the on-disk response cache configured in `mi.options`, or None if caching is disabled.
+    """
+    global _cache
+    if not options.get("cache", False):
+        return None
+    cache_dir = options.get("cache_dir") or default_cache_dir()
+    max_size = options.get("cache_max_size")
+    with _cache_lock:
+        if _cache is None or _cache.cache_dir != cache_dir:
+            if _cache is not None:
+                _cache.close()
+            _cache = ResponseCache(cache_dir, max_size=max_size)
+        _cache.max_size = max_size
+        return _cache
+
+
+def cache_ttl(function_name):
+    """
+    Return the time to live in seconds for cached responses of an API function.
+    """
+    ttls = options.get("cache_ttl") or {}
+    return ttls.get(function_name, ttls.get("default"))
+
+
+def clear_cache(function_name=None):
+    """
+    Delete cached API responses from disk.
+
+    Args:
+        function_name (str, optional): Only delete responses of this API function,
+                                       e.g. "get_x_data". Default is None, deleting everything.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.clear_cache()
+    """
+    cache_dir = options.get("cache_dir") or default_cache_dir()
+    if not os.path.exists(os.path.join(cache_dir, "responses.sqlite")):
+        return
+    with _cache_lock:
+        cache = _cache if _cache is not None and _cache.cache_dir == cache_dir else None
+    if cache is None:
+        cache = ResponseCache(cache_dir)
+        try:
+            cache.clear(function_name)
+        finally:
+            cache.close()
+    else:
+        cache.clear(function_name)
+
+
+def cache_info():
+    """
+    Return the location, number of entries and total size in bytes of the on-disk cache.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.options["cache"] = True
+        >>> mi.cache_info()
+    """
+    cache = get_cache()
+    if cache is None:
+        cache = ResponseCache(options.get("cache_dir") or default_cache_dir())
+        try:
+            return cache.info()
+        finally:
+            cache.close()
+    return cache.info()
@@ -0,0 +1,284 @@
+"""
+Local catalog of the sources, their coverage and their filters.
+
+`build()` crawls the metadata endpoints concurrently into an SQLite index, after which the query
+helpers answer discovery questions locally instead of with dozens of API requests.
+
+Example:
+    >>> import mapineqpy as mi
+    >>> mi.catalog.build()
+    >>> mi.catalog.find_sources("crime")
+    >>> mi.catalog.sources_covering(year=2018, level="3")
+    >>> mi.catalog.sources_with_field("iccs")
+"""
+
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from mapineqpy.cache import default_cache_dir
+from mapineqpy.client import get_client
+from mapineqpy.concurrency import _map_concurrent
+from mapineqpy.levels import nuts_levels
+from mapineqpy.memo import clear_metadata_cache
+from mapineqpy.options import options
+from mapineqpy.source_filters import source_filters
+from mapineqpy.sources import sources, source_coverage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_name TEXT PRIMARY KEY,
+    short_description TEXT,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    source_name TEXT NOT NULL,
+    nuts_level TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    PRIMARY KEY (source_name, nuts_level, year)
+);
+CREATE INDEX IF NOT EXISTS coverage_level_year ON coverage (nuts_level, year);
+CREATE TABLE IF NOT EXISTS filters (
+    source_name TEXT NOT NULL,
+    nuts_level TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    field TEXT,
+    field_label TEXT,
+    value TEXT,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS filters_source ON filters (source_name, nuts_level, year);
+CREATE INDEX IF NOT EXISTS filters_field ON filters (field);
+CREATE TABLE IF NOT EXISTS crawled_filters (
+    source_name TEXT NOT NULL,
+    nuts_level TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    PRIMARY KEY (source_name, nuts_level, year)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def default_path():
+    """
+    Return the catalog location: `mi.options["catalog_path"]`, or `catalog.sqlite` in the cache directory.
+    """
+    return options.get("catalog_path") or os.path.join(
+        options.get("cache_dir") or default_cache_dir(), "catalog.sqlite"
+    )
+
+
+def _connect(path=None, create=False):
+    path = path or default_path()
+    if not create and not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No catalog found at '{path}'. Build it first by running:\n  mi.catalog.build()"
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def build(path=None, filters="latest", refresh=False, client=None):
+    """
+    Crawl sources, coverage and filters into a local SQLite catalog.
+
+    Args:
+        path (str, optional): Catalog file. Default is None, using `default_path()`.
+        filters (str): Which filters to index: "latest" (default) fetches the filters of the most recent
+                       year of every source and NUTS level, "all" of every covered year, "none" skips them.
+        refresh (bool): If False (default), the build is incremental: sources and coverage are re-read,
+                        but filters are only fetched for (source, year, level) combinations not yet indexed.
+                        If True, everything is fetched again.
+        client (MapineqClient, optional): Client to use for the requests. Default is the shared default client.
+
+    Returns:
+        dict: The number of indexed sources, coverage rows and filter rows, and of filter requests made.
+    """
+    if filters not in ("latest", "all", "none"):
+        raise ValueError("`filters` must be one of 'latest', 'all', 'none'.")
+    if client is None:
+        client = get_client()
+
+    # The catalog should reflect the API now, not what was memoized earlier in the process
+    clear_metadata_cache()
+
+    levels = nuts_levels(client=client)
+    source_frames = _map_concurrent(
+        sources.__wrapped__, [{"level": level, "client": client} for level in levels]
+    )
+    all_sources = pd.concat(source_frames, ignore_index=True).drop_duplicates("source_name")
+
+    coverage_frames = _map_concurrent(
+        source_coverage.__wrapped__,
+        [{"source_name": name, "client": client} for name in all_sources["source_name"]],
+    )
+    coverage_df = pd.concat(coverage_frames, ignore_index=True)[["source_name", "nuts_level", "year"]]
+    coverage_df["nuts_level"] = coverage_df["nuts_level"].astype(str)
+    coverage_df["year"] = coverage_df["year"].astype(int)
+
+    conn = _connect(path, create=True)
+    try:
+        with conn:
+            if refresh:
+                conn.execute("DELETE FROM filters")
+                conn.execute("DELETE FROM crawled_filters")
+            conn.execute("DELETE FROM sources")
+            conn.execute("DELETE FROM coverage")
+            conn.executemany(
+                "INSERT INTO sources VALUES (?, ?, ?)",
+                all_sources[["source_name", "short_description", "description"]].itertuples(index=False),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO coverage VALUES (?, ?, ?)",
+                coverage_df.itertuples(index=False),
+            )
+
+        if filters == "none":
+            planned = []
+        else:
+            if filters == "latest":
+                wanted = coverage_df.groupby(["source_name", "nuts_level"], as_index=False)["year"].max()
+            else:
+                wanted = coverage_df
+            crawled = set(conn.execute("SELECT source_name, nuts_level, year FROM crawled_filters"))
+            planned = [
+                (source_name, level, year)
+                for source_name, level, year in wanted.itertuples(index=False)
+                if (source_name, level, int(year)) not in crawled
+            ]
+
+        results = _map_concurrent(
+            source_filters.__wrapped__,
+            [
+                {"source_name": source_name, "year": int(year), "level": level, "client": client}
+                for source_name, level, year in planned
+            ],
+            errors="return",
+        )
+        with conn:
+            for (source_name, level, year), result in zip(planned, results):
+                if isinstance(result, Exception):
+                    continue  # Left for the next incremental build
+                conn.executemany(
+                    "INSERT INTO filters VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (source_name, level, int(year), row.field, row.field_label, row.value, row.label)
+                        for row in result.itertuples(index=False)
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO crawled_filters VALUES (?, ?, ?)", (source_name, level, int(year))
+                )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', ?)", (str(time.time()),))
+
+        return {
+            "sources": len(all_sources),
+            "coverage": len(coverage_df),
+            "filters": conn.execute("SELECT COUNT(*) FROM filters").fetchone()[0],
+            "filter_requests": len(planned),
+        }
+    finally:
+        conn.close()
+
+
+def _query(sql, params=(), path=None):
+    conn = _connect(path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def find_sources(keyword, path=None):
+    """
+    Find sources whose name or descriptions contain a keyword (case-insensitive).
+
+    Returns:
+        pd.DataFrame: `source_name`, `short_description` and `description` of the matching sources.
+    """
+    pattern = f"%{keyword}%"
+    return _query(
+        "SELECT source_name, short_description, description FROM sources"
+        " WHERE source_name LIKE ? OR short_description LIKE ? OR description LIKE ?"
+        " ORDER BY source_name",
+        (pattern, pattern, pattern),
+        path,
+    )
+
+
+def sources_covering(year=None, level=None, path=None):
+    """
+    Find sources available for a year and/or NUTS level.
+
+    Returns:
+        pd.DataFrame: `source_name`, `short_description` and `description` of the matching sources.
+    """
+    conditions, params = [], []
+    if year is not None:
+        conditions.append("c.year = ?")
+        params.append(int(year))
+    if level is not None:
+        conditions.append("c.nuts_level = ?")
+        params.append(str(level))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return _query(
+        "SELECT DISTINCT s.source_name, s.short_description, s.description"
+        f" FROM coverage c JOIN sources s ON s.source_name = c.source_name {where}"
+        " ORDER BY s.source_name",
+        tuple(params),
+        path,
+    )
+
+
+def coverage(source_name, path=None):
+    """
+    Return the indexed NUTS level and year coverage of a source.
+
+    Returns:
+        pd.DataFrame: `nuts_level` and `year` columns.
+    """
+    return _query(
+        "SELECT nuts_level, year FROM coverage WHERE source_name = ? ORDER BY nuts_level, year",
+        (source_name,),
+        path,
+    )
+
+
+def sources_with_field(field, value=None, path=None):
+    """
+    Find sources that have a filter field, optionally with a specific value.
+
+    Returns:
+        pd.DataFrame: `source_name`, `nuts_level` and `year` for which the field (and value) is indexed.
+    """
+    sql = "SELECT DISTINCT source_name, nuts_level, year FROM filters WHERE field = ?"
+    params = [field]
+    if value is not None:
+        sql += " AND value = ?"
+        params.append(value)
+    return _query(sql + " ORDER BY source_name, nuts_level, year", tuple(params), path)
+
+
+def indexed_filters(source_name, year=None, level=None, path=None):
+    """
+    Return the indexed filters of a source, in the layout of `source_filters()`.
+
+    Returns:
+        pd.DataFrame: `nuts_level`, `year`, `field`, `field_label`, `label` and `value` columns.
+    """
+    sql = "SELECT nuts_level, year, field, field_label, label, value FROM filters WHERE source_name = ?"
+    params = [source_name]
+    if year is not None:
+        sql += " AND year = ?"
+        params.append(int(year))
+    if level is not None:
+        sql += " AND nuts_level = ?"
+        params.append(str(level))
+    return _query(sql, tuple(params), path)
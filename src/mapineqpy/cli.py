@@ -0,0 +1,95 @@
+"""
+Command line interface, installed as the `mapineqpy` command.
+
+Example:
+    $ mapineqpy export indicators.yaml --output exports --max-concurrency 16
+    $ mapineqpy sync indicators.yaml --output exports
+"""
+
+import argparse
+import sys
+
+from mapineqpy.options import options
+
+
+def _report_errors(summary):
+    for task, error in summary["errors"]:
+        print(f"Failed: {task['x_source']} level={task['level']} year={task['year']}: {error}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+def _export(args):
+    from mapineqpy.export import export, load_spec
+
+    spec = load_spec(args.spec)
+    summary = export(spec, output=args.output, resume=not args.restart, progress=not args.quiet)
+    print(
+        f"{summary['completed']} requests completed, {summary['skipped']} already done, "
+        f"{summary['failed']} failed, {summary['rows']:,} rows written."
+    )
+    return _report_errors(summary)
+
+
+def _sync(args):
+    from mapineqpy.export import load_spec, sync
+
+    spec = load_spec(args.spec)
+    summary = sync(spec, output=args.output, revalidate=not args.new_only, progress=not args.quiet)
+    print(
+        f"{summary['new']} new, {summary['changed']} changed, {summary['unchanged']} unchanged, "
+        f"{summary['failed']} failed, {summary['stale']} no longer covered, {summary['rows']:,} rows written."
+    )
+    return _report_errors(summary)
+
+
+def main(argv=None):
+    """
+    Entry point of the `mapineqpy` command.
+    """
+    parser = argparse.ArgumentParser(prog="mapineqpy", description="Access data from the Mapineq.org API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser(
+        "export",
+        help="Export data described in a spec file to a partitioned Parquet dataset.",
+        description="Fetch every query of a JSON or YAML spec file concurrently into Parquet files "
+        "partitioned by source, level and year. Interrupted exports resume where they stopped.",
+    )
+    export_parser.add_argument("--restart", action="store_true", help="Ignore progress of previous runs.")
+    export_parser.set_defaults(handler=_export)
+
+    sync_parser = commands.add_parser(
+        "sync",
+        help="Update an export with new coverage and changed data.",
+        description="Fetch years and levels newly covered by the sources of a spec file, and rewrite exported "
+        "results whose data changed, using conditional requests where the API supports them.",
+    )
+    sync_parser.add_argument("--new-only", action="store_true", help="Only fetch new requests, skip revalidation.")
+    sync_parser.set_defaults(handler=_sync)
+
+    for command_parser in (export_parser, sync_parser):
+        command_parser.add_argument("spec", help="JSON or YAML spec file, see `mapineqpy.export`.")
+        command_parser.add_argument("-o", "--output", help="Output directory. Default is `output` in the spec.")
+        command_parser.add_argument(
+            "--max-concurrency", type=int, help=f"Concurrent requests. Default is {options['max_concurrency']}."
+        )
+        command_parser.add_argument("--cache", action="store_true", help="Use the on-disk response cache.")
+        command_parser.add_argument("-q", "--quiet", action="store_true", help="Do not show a progress bar.")
+
+    args = parser.parse_args(argv)
+    if getattr(args, "max_concurrency", None) is not None:
+        options["max_concurrency"] = args.max_concurrency
+    if getattr(args, "cache", False):
+        options["cache"] = True
+    try:
+        return args.handler(args)
+    except (ValueError, ImportError, OSError) as e:
+        print(f"mapineqpy: error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("Interrupted, run the same command again to resume.", file=sys.stderr)
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
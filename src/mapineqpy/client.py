@@ -0,0 +1,441 @@
+import json
+import threading
+import time
+
+from mapineqpy import instrument
+from mapineqpy.cache import get_cache, cache_key, cache_ttl
+from mapineqpy.config import API_MAX_LIMIT, BASE_API_ENDPOINT, USER_AGENT, POOL_SIZE, TIMEOUT, STREAM_CHUNK_SIZE
+from mapineqpy.options import options
+from mapineqpy.retry import RETRY_STATUSES, RateLimiter, get_rate_limiter, get_retry_policy
+from mapineqpy.snapshot import get_recorder, get_replay
+from mapineqpy.streaming import iter_json_array
+
+
+def _parse(body, event):
+    """
+    Decode a JSON body, adding the time spent to the request event, if any.
+    """
+    if event is None:
+        return json.loads(body)
+    started = time.perf_counter()
+    result = json.loads(body)
+    event["parse"] += time.perf_counter() - started
+    return result
+
+
+def _accept_encoding():
+    """
+    Value of the `Accept-Encoding` header: every compression urllib3 can decode in this environment
+    (brotli and zstd need the optional `brotli` and `zstandard` packages), or "identity" if
+    `mi.options["compression"]` is False.
+    """
+    if not options.get("compression", True):
+        return "identity"
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    return ACCEPT_ENCODING
+
+
+def _wire_bytes(response):
+    """
+    Number of body bytes received for a response, before decompression.
+    """
+    tell = getattr(response.raw, "tell", None)
+    return tell() if tell is not None else len(response.content)
+
+
+class MapineqClient:
+    """
+    HTTP client for the Mapineq API that reuses connections across calls.
+
+    The client owns a `requests.Session` with a pooled, keep-alive connection adapter, so
+    consecutive calls to the API skip the TCP and TLS handshakes. All module-level functions
+    (`mi.data`, `mi.sources`, ...) route through a shared default client, see `get_client`.
+    A client can also be used directly, or passed to any function via its `client` argument.
+
+    Args:
+        pool_size (int): Maximum number of connections kept open to the API host. Default is 10. The pool
+                         grows to `mi.options["max_concurrency"]` if that is larger, so that concurrent
+                         requests never open connections that cannot be kept alive.
+        timeout (float or tuple): Request timeout in seconds, either a single number or a
+                                  `(connect, read)` tuple. Default is (10, 120).
+        base_api_endpoint (str): Base URL of the API functions. Default is the public Mapineq API.
+        user_agent (str): User-Agent header sent with every request.
+        retry (RetryPolicy, optional): Retry policy for transient errors. Default is None, using
+                                       `mi.options["retries"]`, `["backoff_factor"]` and `["backoff_max"]`.
+        rate_limit (RateLimiter or float, optional): Rate limiter, or a number of requests per second, for
+                                                     this client. Default is None, using the limiter shared by
+                                                     all clients and set by `mi.options["rate_limit"]`.
+        cache_bypass (bool, optional): Ignore cached responses and refetch (fresh responses are still stored).
+                                       Default is None, using `mi.options["cache_bypass"]`.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> with mi.MapineqClient(pool_size=20) as client:
+        ...     levels = client.nuts_levels()
+        ...     df = client.sources(level="2")
+    """
+
+    def __init__(
+        self,
+        pool_size=POOL_SIZE,
+        timeout=TIMEOUT,
+        base_api_endpoint=BASE_API_ENDPOINT,
+        user_agent=USER_AGENT,
+        retry=None,
+        rate_limit=None,
+        cache_bypass=None,
+    ):
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("`pool_size` must be a positive integer.")
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.base_api_endpoint = base_api_endpoint
+        self.user_agent = user_agent
+        self.retry = retry
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self.rate_limit = rate_limit
+        self.cache_bypass = cache_bypass
+
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._pool_maxsize = 0
+
+    @property
+    def session(self):
+        """
+        The `requests.Session` of the client, created on first use so that requests served from the
+        cache or a snapshot do not import `requests` at all. Its connection pool is enlarged when
+        `mi.options["max_concurrency"]` is raised above the pool size.
+        """
+        pool_maxsize = max(self.pool_size, options.get("max_concurrency", 8))
+        if self._session is None or self._pool_maxsize < pool_maxsize:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+
+                    session = requests.Session()
+                    session.headers.update(
+                        {"Content-Type": "application/json", "User-Agent": self.user_agent}
+                    )
+                    self._mount(session, pool_maxsize)
+                    self._session = session
+                elif self._pool_maxsize < pool_maxsize:
+                    self._mount(self._session, pool_maxsize)
+        return self._session
+
+    def _mount(self, session, pool_maxsize):
+        from requests.adapters import HTTPAdapter
+
+        previous = session.adapters.get("https://")
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._pool_maxsize = pool_maxsize
+        if previous is not None:
+            # Connections in use are closed when released to the old pool
+            previous.close()
+
+    def url(self, function_name):
+        """
+        Build the full URL of an API function, e.g. "get_x_data".
+        """
+        return f"{self.base_api_endpoint}{function_name}/items.json"
+
+    def get(self, function_name, params=None, stream=False, headers=None):
+        """
+        Perform a GET request against an API function and return the response.
+
+        Requests wait for the rate limiter, if any, and transient errors (connection errors, timeouts,
+        429 and 5xx responses) are retried according to the retry policy. Compressed responses are
+        accepted unless `mi.options["compression"]` is False.
+
+        Args:
+            function_name (str): Name of the API function, e.g. "get_levels".
+            params (dict, optional): Query parameters.
+            stream (bool): Whether to defer downloading the body. Default is False.
+            headers (dict, optional): Extra request headers, e.g. `If-None-Match` for a conditional request.
+
+        Returns:
+            requests.Response: The response, after `raise_for_status()`.
+        """
+        import requests
+
+        retry = self.retry if self.retry is not None else get_retry_policy()
+        rate_limit = self.rate_limit if self.rate_limit is not None else get_rate_limiter()
+        url = self.url(function_name)
+        event = instrument.current_request()
+        headers = {"Accept-Encoding": _accept_encoding(), **(headers or {})}
+
+        attempt = 0
+        while True:
+            if rate_limit is not None:
+                started = time.perf_counter()
+                rate_limit.acquire()
+                if event is not None:
+                    event["wait"] += time.perf_counter() - started
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=self.timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retry.retries:
+                    raise
+                delay = retry.delay(attempt)
+                if event is not None:
+                    event["network"] += time.perf_counter() - started
+                    event["wait"] += delay
+                    event["retries"] = attempt + 1
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if event is not None:
+                event["network"] += time.perf_counter() - started
+                event["status"] = response.status_code
+                event["encoding"] = response.headers.get("Content-Encoding", "identity")
+                if not stream:
+                    event["bytes"] += len(response.content)
+                    event["wire_bytes"] += _wire_bytes(response)
+
+            delay = None
+            if response.status_code in RETRY_STATUSES and attempt < retry.retries:
+                delay = retry.delay(attempt, response)
+            if delay is not None:
+                response.close()
+                if event is not None:
+                    event["wait"] += delay
+                    event["retries"] = attempt + 1
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response
+
+    def get_json(self, function_name, params=None):
+        """
+        Perform a GET request against an API function and return the parsed JSON body.
+
+        If `mi.options["cache"]` is enabled, the body is served from and stored in the on-disk cache.
+        In replay mode (`mi.options["replay"]`) it is read from the snapshot, without network access,
+        and while recording a snapshot (`record_snapshot()`) the body is added to it.
+        """
+        with instrument.request(function_name, params) as event, instrument.tracking(event):
+            replay = get_replay()
+            if replay is not None:
+                body = replay.get(function_name, params)
+                if body is None:
+                    raise ValueError(
+                        f"The request to '{function_name}' with parameters {params} is not in the snapshot "
+                        f"'{replay.path}'. Record it with `mi.record_snapshot()` or unset `mi.options['replay']`."
+                    )
+                if event is not None:
+                    event["cache"] = "replay"
+                return _parse(body, event)
+
+            recorder = get_recorder()
+            cache = get_cache()
+            if cache is None:
+                response = self.get(function_name, params=params)
+                result = _parse(response.content, event)
+                if recorder is not None:
+                    recorder.add(function_name, params, response.content)
+                return result
+
+            key = cache_key(self.url(function_name), params)
+            bypass = self.cache_bypass if self.cache_bypass is not None else options.get("cache_bypass", False)
+            if not bypass:
+                body = cache.get(key, ttl=cache_ttl(function_name))
+                if body is not None:
+                    if event is not None:
+                        event["cache"] = "hit"
+                    if recorder is not None:
+                        recorder.add(function_name, params, body)
+                    return _parse(body, event)
+
+            if event is not None:
+                event["cache"] = "miss"
+            response = self.get(function_name, params=params)
+            result = _parse(response.content, event)
+            cache.set(key, function_name, response.content)
+            if recorder is not None:
+                recorder.add(function_name, params, response.content)
+            return result
+
+    def _streams_json(self):
+        """
+        Whether `iter_json()` streams and parses responses incrementally, see there.
+        """
+        return (
+            options.get("stream_json", False)
+            and get_cache() is None
+            and get_replay() is None
+            and get_recorder() is None
+        )
+
+    def iter_json(self, function_name, params=None):
+        """
+        Perform a GET request against an API function returning a JSON array, and yield its elements.
+
+        With `mi.options["stream_json"]` enabled, and unless the on-disk cache or a snapshot replay or recording
+        is active, the body is streamed and parsed incrementally instead of being loaded and decoded at once.
+        This lowers peak memory on large responses, but parsing takes about 1.6 times as long as `json.loads`.
+        """
+        if not self._streams_json():
+            try:
+                result = self.get_json(function_name, params=params)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Failed to parse JSON response: {e}")
+            if not isinstance(result, list):
+                raise ValueError("Unexpected response format from the API.")
+            yield from result
+            return
+
+        with instrument.request(function_name, params) as event:
+            started = time.perf_counter()
+            with instrument.tracking(event):
+                response = self.get(function_name, params=params, stream=True)
+            with response:
+                chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                if event is None:
+                    yield from iter_json_array(chunks)
+                    return
+                yield from iter_json_array(instrument.timed_chunks(chunks, event))
+                event["wire_bytes"] += _wire_bytes(response)
+            # Waiting for chunks counts as network time, the rest of the iteration is parsing
+            event["parse"] = time.perf_counter() - started - event["wait"] - event["network"]
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"MapineqClient(pool_size={self.pool_size}, timeout={self.timeout!r}, "
+            f"base_api_endpoint={self.base_api_endpoint!r})"
+        )
+
+    # Convenience wrappers around the module-level functions using this client
+
+    def nuts_levels(self):
+        from mapineqpy.levels import nuts_levels
+
+        return nuts_levels(client=self)
+
+    def sources(self, level, year=None, limit=2500):
+        from mapineqpy.sources import sources
+
+        return sources(level, year=year, limit=limit, client=self)
+
+    def source_coverage(self, source_name, limit=2500):
+        from mapineqpy.sources import source_coverage
+
+        return source_coverage(source_name, limit=limit, client=self)
+
+    def source_filters(self, source_name, year, level, filters=None, limit=2500):
+        from mapineqpy.source_filters import source_filters
+
+        return source_filters(
+            source_name, year, level, filters=filters, limit=limit, client=self
+        )
+
+    def data(self, x_source, y_source=None, year=None, level=None, x_filters=None, y_filters=None, limit=2500, page_size=API_MAX_LIMIT, join=None, duplicates=None):
+        from mapineqpy.data import data
+
+        return data(
+            x_source,
+            y_source=y_source,
+            year=year,
+            level=level,
+            x_filters=x_filters,
+            y_filters=y_filters,
+            limit=limit,
+            page_size=page_size,
+            join=join,
+            duplicates=duplicates,
+            client=self,
+        )
+
+    def iter_data(self, x_source, y_source=None, year=None, level=None, x_filters=None, y_filters=None, limit=None, page_size=API_MAX_LIMIT, duplicates=None):
+        from mapineqpy.data import iter_data
+
+        return iter_data(
+            x_source,
+            y_source=y_source,
+            year=year,
+            level=level,
+            x_filters=x_filters,
+            y_filters=y_filters,
+            limit=limit,
+            page_size=page_size,
+            duplicates=duplicates,
+            client=self,
+        )
+
+    def panel(self, x_source, years=None, level=None, x_filters=None, y_source=None, y_filters=None, shape="long", limit=2500):
+        from mapineqpy.panel import panel
+
+        return panel(
+            x_source,
+            years=years,
+            level=level,
+            x_filters=x_filters,
+            y_source=y_source,
+            y_filters=y_filters,
+            shape=shape,
+            limit=limit,
+            client=self,
+        )
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the default client used by the module-level functions, creating it on first use.
+
+    Returns:
+        MapineqClient: The shared default client.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = MapineqClient()
+    return _default_client
+
+
+def set_client(client):
+    """
+    Replace the default client used by the module-level functions.
+
+    Args:
+        client (MapineqClient or None): The new default client. Pass None to reset, a fresh
+                                        client with default settings is then created on next use.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.set_client(mi.MapineqClient(pool_size=32, timeout=30))
+    """
+    global _default_client
+    if client is not None and not isinstance(client, MapineqClient):
+        raise ValueError("`client` must be a MapineqClient instance or None.")
+    with _default_client_lock:
+        previous, _default_client = _default_client, client
+    if previous is not None and previous is not client:
+        previous.close()
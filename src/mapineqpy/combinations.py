@@ -0,0 +1,118 @@
+import itertools
+
+import pandas as pd
+
+from mapineqpy.client import get_client
+from mapineqpy.concurrency import _map_concurrent
+from mapineqpy.data import data
+from mapineqpy.output import with_output
+from mapineqpy.source_filters import source_filters
+
+
+def expand_filters(available_filters, filters=None):
+    """
+    Expand partial filters into all combinations of the remaining filter values.
+
+    Args:
+        available_filters (pd.DataFrame): Output of `source_filters()`, with `field` and `value` columns.
+                                          Polars DataFrames are accepted too.
+        filters (dict, optional): Filters already chosen, as a dictionary of field-value pairs. These fields
+                                  are kept fixed. Default is None.
+
+    Returns:
+        list: A list of filter dictionaries, one per combination of the values of the unspecified fields.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> available = mi.source_filters("CRIM_GEN_REG", year=2010, level="2")
+        >>> mi.expand_filters(available, {"unit": "NR"})
+        [{'unit': 'NR', 'freq': 'A', 'iccs': 'ICCS0101'}, {'unit': 'NR', 'freq': 'A', 'iccs': 'ICCS0401'}, ...]
+    """
+    if filters is None:
+        filters = {}
+    if hasattr(available_filters, "to_pandas"):
+        available_filters = available_filters.to_pandas()
+
+    missing_columns = {"field", "value"} - set(available_filters.columns)
+    if missing_columns:
+        raise ValueError("`available_filters` must be the output of `source_filters()`.")
+
+    open_fields = available_filters[~available_filters["field"].isin(filters.keys())]
+    # Keep the order in which the API lists fields and values
+    values = {
+        field: list(dict.fromkeys(group["value"]))
+        for field, group in open_fields.groupby("field", sort=False)
+    }
+
+    return [
+        dict(filters, **dict(zip(values.keys(), combination)))
+        for combination in itertools.product(*values.values())
+    ]
+
+
+@with_output
+def data_combinations(
+    x_source, year=None, level=None, x_filters=None, available_filters=None, limit=2500, client=None
+):
+    """
+    Fetch univariate data for every combination of the filter values not fixed in `x_filters`.
+
+    For sources with several values per filter field (e.g. several `iccs` codes in "CRIM_GEN_REG"),
+    all combinations are fetched concurrently with `data()` and returned as one tidy DataFrame.
+
+    Args:
+        x_source (str): Source name.
+        year (int): The year for data.
+        level (str): The NUTS level ("0", "1", "2", "3").
+        x_filters (dict, optional): Filters to keep fixed, as a dictionary of field-value pairs. Default is None.
+        available_filters (pd.DataFrame, optional): Output of `source_filters()` for the same source, year and
+                                                    level. Default is None, fetching it.
+        limit (int): Maximum number of results per combination, passed to `data()`. Default is 2500.
+        client (MapineqClient, optional): Client to use for the requests. Default is the shared default client.
+
+    Returns:
+        pd.DataFrame: The columns of `data()`, followed by one column per filter field holding the filter
+        value of each row. Combinations without data have no rows.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> df = mi.data_combinations("CRIM_GEN_REG", year=2010, level="2", x_filters={"unit": "NR"})
+    """
+    if x_filters is None:
+        x_filters = {}
+    if client is None:
+        client = get_client()
+    if available_filters is None:
+        available_filters = source_filters.__wrapped__(source_name=x_source, year=year, level=level, client=client)
+
+    combinations = expand_filters(available_filters, x_filters)
+    frames = _map_concurrent(
+        data.__wrapped__,
+        [
+            {
+                "x_source": x_source,
+                "year": year,
+                "level": level,
+                "x_filters": combination,
+                "limit": limit,
+                "client": client,
+            }
+            for combination in combinations
+        ],
+    )
+
+    # The values of each field are listed independently, some of their combinations have no data
+    found = [(combination, frame) for combination, frame in zip(combinations, frames) if len(frame)]
+    if found:
+        combinations, frames = zip(*found)
+    else:
+        # Keep one empty frame, for the columns
+        combinations, frames = combinations[:1], frames[:1]
+
+    df = pd.concat(frames, ignore_index=True)
+    lengths = [len(frame) for frame in frames]
+    for field in combinations[0]:
+        df[field] = pd.Series(
+            [combination[field] for combination in combinations]
+        ).repeat(lengths).reset_index(drop=True)
+    return df
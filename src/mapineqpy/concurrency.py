@@ -0,0 +1,414 @@
+import asyncio
+import functools
+import pickle
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from mapineqpy.config import API_MAX_LIMIT
+from mapineqpy.options import options
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()
+_thread_name_prefix = "mapineqpy"
+
+
+def _max_concurrency():
+    max_concurrency = options.get("max_concurrency", 8)
+    if not isinstance(max_concurrency, int) or max_concurrency < 1:
+        raise ValueError("`options['max_concurrency']` must be a positive integer.")
+    return max_concurrency
+
+
+def _get_executor():
+    """
+    Return the shared thread pool, resized if `options['max_concurrency']` has changed.
+    """
+    global _executor, _executor_workers
+    max_concurrency = _max_concurrency()
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_concurrency:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                max_workers=max_concurrency, thread_name_prefix=_thread_name_prefix
+            )
+            _executor_workers = max_concurrency
+        return _executor
+
+
+def _get_semaphore(loop):
+    max_concurrency = _max_concurrency()
+    entry = _semaphores.get(loop)
+    if entry is None or entry[0] != max_concurrency:
+        entry = (max_concurrency, asyncio.Semaphore(max_concurrency))
+        _semaphores[loop] = entry
+    return entry[1]
+
+
+async def _run_async(func, *args, **kwargs):
+    """
+    Run a blocking API call in the shared thread pool, bounded by the concurrency semaphore.
+    """
+    loop = asyncio.get_event_loop()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(
+            _get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+
+def _map_concurrent(func, kwargs_list, errors="raise"):
+    """
+    Call `func(**kwargs)` for every item of `kwargs_list` in the shared thread pool.
+
+    Results are returned in the order of `kwargs_list`. With `errors="return"` exceptions
+    are placed in the result list instead of being raised. Calls made from a worker of the
+    pool itself run sequentially, so nested bulk calls cannot exhaust the pool and deadlock.
+    """
+    if errors not in ("raise", "return"):
+        raise ValueError("`errors` must be one of 'raise', 'return'.")
+
+    if threading.current_thread().name.startswith(_thread_name_prefix):
+        results = []
+        for kwargs in kwargs_list:
+            try:
+                results.append(func(**kwargs))
+            except Exception as e:
+                if errors == "raise":
+                    raise
+                results.append(e)
+        return results
+
+    executor = _get_executor()
+    futures = [executor.submit(func, **kwargs) for kwargs in kwargs_list]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            if errors == "raise":
+                for pending in futures:
+                    pending.cancel()
+                raise
+            results.append(e)
+    return results
+
+
+async def anuts_levels(client=None):
+    """
+    Asynchronous version of `nuts_levels`.
+
+    Example:
+        >>> levels = await mi.anuts_levels()
+    """
+    from mapineqpy.levels import nuts_levels
+
+    return await _run_async(nuts_levels, client=client)
+
+
+async def asources(level, year=None, limit=2500, client=None):
+    """
+    Asynchronous version of `sources`. Takes the same arguments.
+
+    Example:
+        >>> df = await mi.asources(level="2", year=2020)
+    """
+    from mapineqpy.sources import sources
+
+    return await _run_async(sources, level, year=year, limit=limit, client=client)
+
+
+async def asource_coverage(source_name, limit=2500, client=None):
+    """
+    Asynchronous version of `source_coverage`. Takes the same arguments.
+
+    Example:
+        >>> df = await mi.asource_coverage("CRIM_GEN_REG")
+    """
+    from mapineqpy.sources import source_coverage
+
+    return await _run_async(source_coverage, source_name, limit=limit, client=client)
+
+
+async def asource_filters(source_name, year, level, filters=None, limit=2500, client=None):
+    """
+    Asynchronous version of `source_filters`. Takes the same arguments.
+
+    Example:
+        >>> df = await mi.asource_filters("CRIM_GEN_REG", year=2010, level="2")
+    """
+    from mapineqpy.source_filters import source_filters
+
+    return await _run_async(
+        source_filters, source_name, year, level, filters=filters, limit=limit, client=client
+    )
+
+
+async def adata(
+    x_source, y_source=None, year=None, level=None, x_filters=None, y_filters=None, limit=2500, page_size=API_MAX_LIMIT, join=None, duplicates=None, client=None
+):
+    """
+    Asynchronous version of `data`. Takes the same arguments.
+
+    Requests are executed on a shared thread pool using the pooled connections of the client.
+    At most `mi.options["max_concurrency"]` requests (default 8) run at the same time.
+
+    Example:
+        >>> import asyncio
+        >>> import mapineqpy as mi
+        >>> async def main():
+        ...     return await asyncio.gather(*[
+        ...         mi.adata(x_source="CRIM_GEN_REG", year=2010, level=level, x_filters={"iccs": "ICCS05012"})
+        ...         for level in ["0", "1", "2", "3"]
+        ...     ])
+        >>> results = asyncio.run(main())
+    """
+    from mapineqpy.data import data
+
+    return await _run_async(
+        data,
+        x_source,
+        y_source=y_source,
+        year=year,
+        level=level,
+        x_filters=x_filters,
+        y_filters=y_filters,
+        limit=limit,
+        page_size=page_size,
+        join=join,
+        duplicates=duplicates,
+        client=client,
+    )
+
+
+def _client_config(client, processes):
+    """
+    Constructor arguments to rebuild `client` in a worker process. A rate limit is split evenly
+    between the processes, so that together they respect it.
+    """
+    rate_limit = client.rate_limit.rate / processes if client.rate_limit is not None else None
+    return {
+        "pool_size": client.pool_size,
+        "timeout": client.timeout,
+        "base_api_endpoint": client.base_api_endpoint,
+        "user_agent": client.user_agent,
+        "retry": client.retry,
+        "rate_limit": rate_limit,
+        "cache_bypass": client.cache_bypass,
+    }
+
+
+_worker_clients = {}
+
+
+def _worker_client(config):
+    # Shards of the same call carry equal configs, the client (and its connections) is reused between them
+    key = pickle.dumps(config)
+    if key not in _worker_clients:
+        from mapineqpy.client import MapineqClient
+
+        _worker_clients[key] = MapineqClient(**config)
+    return _worker_clients[key]
+
+
+def _encode_result(result):
+    """
+    Encode a result in a worker process for the trip back: DataFrames as Arrow IPC streams (if pyarrow
+    is installed), exceptions that cannot be pickled as RuntimeError, anything else as is.
+    """
+    import pandas as pd
+
+    if isinstance(result, pd.DataFrame):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return "pickle", result
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return "arrow", sink.getvalue().to_pybytes()
+    if isinstance(result, Exception):
+        try:
+            pickle.dumps(result)
+        except Exception:
+            result = RuntimeError(f"{type(result).__name__}: {result}")
+        return "error", result
+    return "pickle", result
+
+
+def _decode_result(kind, payload):
+    if kind == "arrow":
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(payload).read_all().to_pandas()
+    return payload
+
+
+def _run_shard(module_name, func_name, kwargs_list, worker_options):
+    """
+    Run one shard of a bulk call in a worker process, with threads as in `_map_concurrent`.
+    """
+    import importlib
+
+    options.update(worker_options)
+    # Look-ups by name find the public function, call it without its output conversion, as the parent does
+    func = getattr(importlib.import_module(module_name), func_name).__wrapped__
+    kwargs_list = [dict(kwargs, client=_worker_client(kwargs["client"])) for kwargs in kwargs_list]
+    return [_encode_result(result) for result in _map_concurrent(func, kwargs_list, errors="return")]
+
+
+def _map_processes(func, kwargs_list, processes, errors="raise"):
+    """
+    Call `func(**kwargs)` for every item of `kwargs_list`, sharded across `processes` worker processes.
+
+    `func` must be the `__wrapped__` function of a public function decorated with `with_output`, and
+    every kwargs must have a `client`. Outputs are converted by the caller, in this process.
+    Each worker runs its shards with the thread pool, and sends DataFrames back as Arrow IPC streams.
+    Results are returned in the order of `kwargs_list`, whatever the order in which shards complete.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from mapineqpy.snapshot import get_recorder
+
+    if errors not in ("raise", "return"):
+        raise ValueError("`errors` must be one of 'raise', 'return'.")
+    if not isinstance(processes, int) or processes < 1:
+        raise ValueError("`processes` must be a positive integer.")
+    if get_recorder() is not None:
+        raise ValueError("Snapshots cannot be recorded with `processes`, responses are received by other processes.")
+
+    # Workers return plain pandas frames with region metadata: outputs are converted, and the geo
+    # lookup table filled, in this process
+    worker_options = dict(options, geo_metadata="columns", dtypes="default", backend="pandas")
+    if worker_options.get("rate_limit"):
+        worker_options["rate_limit"] = worker_options["rate_limit"] / processes
+    kwargs_list = [dict(kwargs, client=_client_config(kwargs["client"], processes)) for kwargs in kwargs_list]
+
+    # Several contiguous shards per process balance the load, and keep the order easy to restore
+    n_shards = min(len(kwargs_list), processes * 4)
+    bounds = [round(i * len(kwargs_list) / n_shards) for i in range(n_shards + 1)] if n_shards else [0]
+    shards = [kwargs_list[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    # Spawned, not forked: forking a process that runs threads can deadlock the children
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(processes, max(1, n_shards)), mp_context=context) as executor:
+        futures = [
+            executor.submit(_run_shard, func.__module__, func.__name__, shard, worker_options) for shard in shards
+        ]
+        results = []
+        for future in futures:
+            for kind, payload in future.result():
+                if kind == "error" and errors == "raise":
+                    for pending in futures:
+                        pending.cancel()
+                    raise payload
+                results.append(_decode_result(kind, payload))
+    return results
+
+
+def _bulk_kwargs(requests, client, name):
+    kwargs_list = []
+    for request in requests:
+        if not isinstance(request, dict):
+            raise ValueError(f"Each element of `{name}` must be a dictionary of arguments.")
+        kwargs = dict(request)
+        if kwargs.get("client") is None:
+            kwargs["client"] = client
+        kwargs_list.append(kwargs)
+    return kwargs_list
+
+
+def data_many(specs, client=None, errors="raise", processes=None):
+    """
+    Fetch data for several queries concurrently.
+
+    Args:
+        specs (list of dict): Query specifications, each a dictionary of keyword arguments for `data()`,
+                              e.g. `{"x_source": "TGS00010", "year": 2020, "level": "2", "x_filters": {...}}`.
+        client (MapineqClient, optional): Client to use for the requests, unless a spec sets its own.
+                                          Default is the shared default client.
+        errors (str): "raise" (default) to raise the first error encountered, or "return" to place the
+                      exception in the result list in place of the failed query's DataFrame.
+        processes (int, optional): Number of worker processes to shard the queries across, for crawls large
+                                   enough to be bound by parsing and DataFrame building rather than by the
+                                   network. Default is None, running all queries in this process.
+
+    Returns:
+        list: A list of DataFrames, as returned by `data()`, in the same order as `specs`.
+
+    Notes:
+        - At most `mi.options["max_concurrency"]` requests (default 8) run at the same time, per process.
+        - Works both in scripts and in notebooks with a running event loop.
+        - With `processes`, workers are spawned: scripts must guard their entry point with
+          `if __name__ == "__main__":`. Options are copied to the workers, a rate limit is split between
+          them, and DataFrames are sent back as Arrow IPC streams if pyarrow is installed.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> specs = [
+        ...     {"x_source": "CRIM_GEN_REG", "year": year, "level": "2", "x_filters": {"iccs": "ICCS05012"}}
+        ...     for year in [2008, 2009, 2010]
+        ... ]
+        >>> dfs = mi.data_many(specs)
+    """
+    from mapineqpy.data import data
+
+    if client is None and processes is not None:
+        from mapineqpy.client import get_client
+
+        client = get_client()
+    kwargs_list = _bulk_kwargs(specs, client, "specs")
+    if processes is None:
+        return _map_concurrent(data, kwargs_list, errors=errors)
+
+    from mapineqpy.output import convert_output
+
+    from mapineqpy import geo
+
+    results = _map_processes(data.__wrapped__, kwargs_list, processes, errors=errors)
+    if geo._geo_metadata_mode() == "lookup":
+        results = [result if isinstance(result, Exception) else geo._register(result) for result in results]
+    return [result if isinstance(result, Exception) else convert_output(result) for result in results]
+
+
+def source_filters_many(requests, client=None, errors="raise", processes=None):
+    """
+    Fetch the filters of several sources, years and levels concurrently.
+
+    Args:
+        requests (list of dict): Each a dictionary of keyword arguments for `source_filters()`,
+                                 e.g. `{"source_name": "CRIM_GEN_REG", "year": 2010, "level": "2"}`.
+        client (MapineqClient, optional): Client to use for the requests, unless a request sets its own.
+                                          Default is the shared default client.
+        errors (str): "raise" (default) to raise the first error encountered, or "return" to place the
+                      exception in the result list in place of the failed request's DataFrame.
+        processes (int, optional): Number of worker processes to shard the requests across, see `data_many()`.
+                                   Default is None, running all requests in this process.
+
+    Returns:
+        list: A list of DataFrames, as returned by `source_filters()`, in the same order as `requests`.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> filters = mi.source_filters_many(
+        ...     [{"source_name": "CRIM_GEN_REG", "year": year, "level": "2"} for year in range(2008, 2011)]
+        ... )
+    """
+    from mapineqpy.source_filters import source_filters
+
+    if client is None and processes is not None:
+        from mapineqpy.client import get_client
+
+        client = get_client()
+    kwargs_list = _bulk_kwargs(requests, client, "requests")
+    if processes is None:
+        return _map_concurrent(source_filters, kwargs_list, errors=errors)
+
+    from mapineqpy.output import convert_output
+
+    results = _map_processes(source_filters.__wrapped__, kwargs_list, processes, errors=errors)
+    return [result if isinstance(result, Exception) else convert_output(result) for result in results]
@@ -9,9 +9,23 @@ BASE_API_ENDPOINT = "https://mapineqfeatures.web.rug.nl/functions/postgisftw."
 # User agent for requests
 USER_AGENT = "mapineqpy Python package https://github.com/e-kotov/mapineqpy"
 
+# Maximum number of results the API returns per request
+API_MAX_LIMIT = 10000
+
+# Number of keep-alive connections kept open per host by the HTTP client
+POOL_SIZE = 10
+
+# Request timeout in seconds as (connect, read)
+TIMEOUT = (10, 120)
+
+# Size in bytes of the chunks in which large responses are read and parsed
+STREAM_CHUNK_SIZE = 64 * 1024
+
 # Export configuration as a dictionary (if needed)
 DEFAULT_OPTIONS = {
     "api_spec_json": API_SPEC_JSON,
     "base_api_endpoint": BASE_API_ENDPOINT,
     "user_agent": USER_AGENT,
+    "pool_size": POOL_SIZE,
+    "timeout": TIMEOUT,
 }
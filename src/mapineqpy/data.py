@@ -1,69 +1,21 @@
-import requests
 import pandas as pd
 import json
-from mapineqpy.config import BASE_API_ENDPOINT, USER_AGENT
-from mapineqpy import source_filters
+from mapineqpy.client import get_client
+from mapineqpy.concurrency import _map_concurrent, _max_concurrency
+from mapineqpy.config import API_MAX_LIMIT
+from mapineqpy import geo, instrument
+from mapineqpy.source_filters import source_filters
 from mapineqpy.options import options
+from mapineqpy.output import with_output
+from mapineqpy.cache import cache_key
+from mapineqpy.singleflight import single_flight
+from mapineqpy.streaming import records_to_columns
 
-def data(
-    x_source, y_source=None, year=None, level=None, x_filters=None, y_filters=None, limit=2500
-):
-    """
-    Fetch univariate or bivariate data for a specific source, year, NUTS level, and selected filters.
-
-    Args:
-        x_source (str): Source name for the x variable.
-        y_source (str, optional): Source name for the y variable. Default is None.
-        year (int): The year for data.
-        level (str): The NUTS level ("0", "1", "2", "3").
-        x_filters (dict): Filters for the x variable as a dictionary of field-value pairs.
-        y_filters (dict, optional): Filters for the y variable as a dictionary of field-value pairs. Default is None.
-        limit (int): Maximum number of results to return. Default is 2500. This default should be enough for most uses, 
-                     as it is well above the number of NUTS 3 regions in the EU. The maximum allowed by the API is 10,000.
-
-    Returns:
-        pd.DataFrame: A DataFrame containing univariate or bivariate data with the following columns:
-
-        - `geo` (str): (NUTS) region code at the requested level.
-        - `geo_name` (str): Name of the (NUTS) region.
-        - `geo_source` (str): Source type of the spatial units (e.g., "NUTS").
-        - `geo_year` (int): Year of the (NUTS) region classification.
-        - `x_year` (int): The year of the predictor variable (X) (renamed from `predictor_year` or `data_year`).
-        - `y_year` (int, optional): The year of the outcome variable (Y) (renamed from `outcome_year`).
-        - `x` (float): The value of the univariate variable.
-        - `y` (float, optional): The value of the y variable (only included when `y_source` is provided).
-
-    Notes:
-        - If `y_source` is **not** provided, the returned DataFrame contains only univariate data (`x`).
-        - If `y_source` **is** provided, the returned DataFrame includes both predictor (`x`) and outcome (`y`) variables.
-        - Some regions may have missing (`NaN`) values for `x` or `y`, indicating unavailable data.
-
-    Example:
-        # Univariate example
-        >>> import mapineqpy as mi
-        >>> mi.data(
-        ...     x_source="TGS00010",
-        ...     year=2020,
-        ...     level="2",
-        ...     x_filters={"isced11": "TOTAL", "unit": "PC", "age": "Y_GE15", "freq": "A"}
-        ... )
 
-        # Bivariate example
-        >>> import mapineqpy as mi
-        >>> mi.data(
-        ...     x_source="TGS00010",
-        ...     y_source="DEMO_R_MLIFEXP",
-        ...     year=2020,
-        ...     level="2",
-        ...     x_filters={"isced11": "TOTAL", "unit": "PC", "age": "Y_GE15", "freq": "A"},
-        ...     y_filters={"unit": "YR", "age": "Y_LT1", "freq": "A"}
-        ... )
+def _prepare_query(x_source, y_source, year, level, x_filters, y_filters, limit, page_size):
+    """
+    Validate `data()` arguments and build the API function name and query parameters.
     """
-    if x_filters is None:
-        x_filters = {}
-    if y_filters is None:
-        y_filters = {}
-
     # Validate inputs
     if not isinstance(x_source, str) or not x_source:
         raise ValueError("`x_source` must be a non-empty string.")
@@ -73,11 +25,14 @@ def data(
         raise ValueError("`year` must be an integer.")
     if y_source is not None and not isinstance(y_source, str):
         raise ValueError("`y_source` must be a string if provided.")
-    if not isinstance(limit, int) or not (1 <= limit <= 10000):
-        raise ValueError("`limit` must be an integer between 1 and 10,000.")
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError("`limit` must be a positive integer or None.")
+    if not isinstance(page_size, int) or not (1 <= page_size <= API_MAX_LIMIT):
+        raise ValueError(f"`page_size` must be an integer between 1 and {API_MAX_LIMIT:,}.")
 
-    # Build JSON for X filters
-    x_conditions = [{"field": key, "value": value} for key, value in x_filters.items()]
+    # Build JSON for X filters, sorted by field so that equivalent queries share cache, snapshot and
+    # coalescing keys
+    x_conditions = [{"field": key, "value": value} for key, value in sorted(x_filters.items())]
     x_json = {"source": x_source, "conditions": x_conditions}
     # Minify JSON to remove extra whitespace/newlines
     x_json_string = json.dumps(x_json, separators=(",", ":"))
@@ -85,20 +40,19 @@ def data(
     # Build JSON for Y filters if provided
     y_json_string = None
     if y_source and y_filters:
-        y_conditions = [{"field": key, "value": value} for key, value in y_filters.items()]
+        y_conditions = [{"field": key, "value": value} for key, value in sorted(y_filters.items())]
         y_json = {"source": y_source, "conditions": y_conditions}
         y_json_string = json.dumps(y_json, separators=(",", ":"))
 
-    # Determine API endpoint
+    # Determine API function
     if not y_source:
-        endpoint = f"{BASE_API_ENDPOINT}get_x_data/items.json"
+        function_name = "get_x_data"
     else:
-        endpoint = f"{BASE_API_ENDPOINT}get_xy_data/items.json"
+        function_name = "get_xy_data"
 
     # Prepare query parameters
     query_params = {
         "_level": level,
-        "limit": limit,
         "X_JSON": x_json_string,
     }
     if y_source:
@@ -109,33 +63,169 @@ def data(
     if y_json_string:
         query_params["Y_JSON"] = y_json_string
 
-    # Perform the HTTP GET request
-    response = requests.get(
-        endpoint,
-        headers={"Content-Type": "application/json", "User-Agent": USER_AGENT},
-        params=query_params,
-    )
-    response.raise_for_status()
+    return function_name, query_params
+
+
+def _fetch_page(client, function_name, params):
+    """
+    Fetch one page of data as a DataFrame. Identical concurrent requests share a single upstream call,
+    so the returned DataFrame must not be modified.
+    """
+
+    def fetch():
+        if client._streams_json():
+            columns, n_rows = records_to_columns(client.iter_json(function_name, params=params))
+            return pd.DataFrame(columns), n_rows
+        # Without streaming, building the frame straight from the parsed records is fastest
+        try:
+            records = client.get_json(function_name, params=params)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse JSON response: {e}")
+        if not isinstance(records, list):
+            raise ValueError("Unexpected response format from the API.")
+        return pd.DataFrame(records), len(records)
+
+    return single_flight.do(cache_key(client.url(function_name), params), fetch)
+
+
+def _iter_pages(client, function_name, query_params, limit, page_size, fetch_page=_fetch_page):
+    """
+    Fetch the results of a data query page by page using `limit` and `offset`, with `fetch_page`.
 
-    # Parse response and convert to DataFrame
-    df = pd.DataFrame(response.json())
+    Yields one `(df, n_rows)` tuple per page, in order. The DataFrames may be shared with concurrent
+    callers and must not be modified. The first request is sent alone, as most
+    queries fit in one page; after that the number of pages requested concurrently doubles,
+    up to `mi.options["max_concurrency"]`. Fetching stops at the first incomplete page.
+    """
+    offset = 0
+    remaining = limit
+    window_size = 1
+    while remaining is None or remaining > 0:
+        window = []
+        for _ in range(window_size):
+            if remaining is not None and remaining <= 0:
+                break
+            size = page_size if remaining is None else min(page_size, remaining)
+            page_params = dict(query_params, limit=size)
+            if offset:
+                page_params["offset"] = offset
+            window.append((size, page_params))
+            offset += size
+            if remaining is not None:
+                remaining -= size
+
+        if len(window) == 1:
+            pages = [fetch_page(client, function_name, window[0][1])]
+        else:
+            pages = _map_concurrent(
+                fetch_page,
+                [{"client": client, "function_name": function_name, "params": params} for _, params in window],
+            )
+
+        for (size, _), (df, n_rows) in zip(window, pages):
+            if n_rows:
+                yield df, n_rows
+            if n_rows < size:
+                return
 
-    # --- Duplicate checking with additional filter verification ---
-    grouped = df.groupby("geo")
-    distinct_x = grouped["x"].nunique()
-    x_issue = (distinct_x > 1).any()
+        window_size = min(window_size * 2, _max_concurrency())
 
-    y_issue = False
+
+def _fetch_frame(client, function_name, query_params, limit, page_size, function="data"):
+    """
+    Fetch all pages of a data query into one DataFrame.
+    """
+    with instrument.phase("fetch", function):
+        pages = [df for df, _ in _iter_pages(client, function_name, query_params, limit, page_size)]
+    with instrument.phase("frame", function):
+        if not pages:
+            return pd.DataFrame()
+        if len(pages) == 1:
+            # Pages are shared with concurrent callers, later steps rename columns in place
+            return pages[0].copy(deep=False)
+        return pd.concat(pages, ignore_index=True)
+
+
+def _lean_query(query_params, y_source):
+    """
+    Restrict a data query to the columns kept in geo lookup mode, with the `properties` parameter of the API.
+    """
+    if y_source:
+        properties = ["geo", "geo_year", "predictor_year", "outcome_year", "x", "y"]
+    else:
+        properties = ["geo", "geo_year", "data_year", "x"]
+    return dict(query_params, properties=",".join(properties))
+
+
+def _conflicting_geos(df, column):
+    """
+    Return the geos that have more than one distinct non-missing value in `column`.
+    """
+    values = df[["geo", column]].dropna().drop_duplicates()
+    return values.loc[values["geo"].duplicated(), "geo"].unique()
+
+
+def find_duplicates(df):
+    """
+    Find regions with more than one distinct value in a `data()` result.
+
+    This usually means that not all filters with several options were specified. No requests are made.
+
+    Args:
+        df (pd.DataFrame): A DataFrame returned by `data()` (or a raw API response with `geo`, `x` and `y` columns).
+
+    Returns:
+        pd.DataFrame: The rows of `df` belonging to regions with conflicting `x` (or `y`) values, sorted by `geo`.
+        Empty if there are no such regions.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> df = mi.data(x_source="CRIM_GEN_REG", year=2010, level="2", duplicates="keep")
+        >>> mi.find_duplicates(df)
+    """
+    # Fast path: most responses have one row per region
+    if not df["geo"].duplicated().any():
+        return df.iloc[0:0]
+    geos = set(_conflicting_geos(df, "x"))
     if "y" in df.columns:
-        distinct_y = grouped["y"].nunique()
-        y_issue = (distinct_y > 1).any()
+        geos.update(_conflicting_geos(df, "y"))
+    return df[df["geo"].isin(geos)].sort_values("geo", kind="stable")
+
+
+def _duplicates_mode(duplicates):
+    if duplicates is None:
+        duplicates = options.get("duplicates", "raise")
+    if duplicates not in ("raise", "first", "mean", "keep"):
+        raise ValueError("`duplicates` must be one of 'raise', 'first', 'mean', 'keep'.")
+    return duplicates
+
+
+def _resolve_duplicates(df, x_source, y_source, year, level, x_filters, y_filters, client, duplicates):
+    """
+    Handle regions with several values, according to the `duplicates` mode of `data()`.
+    """
+    # Single vectorized pass in the common case of one row per region
+    if df.empty or not df["geo"].duplicated().any():
+        return df
+
+    if duplicates == "keep":
+        return df
+    if duplicates == "first":
+        return df.drop_duplicates("geo", keep="first").reset_index(drop=True)
+    if duplicates == "mean":
+        value_columns = [col for col in ["x", "y"] if col in df.columns]
+        aggregations = {col: ("mean" if col in value_columns else "first") for col in df.columns if col != "geo"}
+        return df.groupby("geo", sort=False, as_index=False).agg(aggregations)
+
+    x_issue = len(_conflicting_geos(df, "x")) > 0
+    y_issue = "y" in df.columns and len(_conflicting_geos(df, "y")) > 0
 
     # Only perform additional filter checking if duplicate geos exist.
-    if not options.get("skip_filter_check", False):
+    if not options.get("skip_filter_check", False) and (x_issue or y_issue):
         missing_x_filters = set()
         if x_issue:
             # Query available filters for x_source
-            available_filters_x = source_filters(source_name=x_source, year=year, level=level)
+            available_filters_x = source_filters.__wrapped__(source_name=x_source, year=year, level=level, client=client)
             # Determine fields with more than one option
             multi_option_fields = (
                 available_filters_x.groupby("field")["value"]
@@ -147,7 +237,7 @@ def data(
 
         missing_y_filters = set()
         if y_issue:
-            available_filters_y = source_filters(source_name=y_source, year=year, level=level)
+            available_filters_y = source_filters.__wrapped__(source_name=y_source, year=year, level=level, client=client)
             multi_option_fields_y = (
                 available_filters_y.groupby("field")["value"]
                 .nunique()
@@ -176,9 +266,23 @@ def data(
                     f"You can review available filters by running:\n"
                     f"  mi.source_filters(source_name='{y_source}', year={year}, level='{level}')"
                 )
+            geos = find_duplicates(df)["geo"].unique()
+            msg += (
+                f"\n\nRegions with several values ({len(geos)}): {', '.join(map(str, geos[:10]))}"
+                f"{', ...' if len(geos) > 10 else ''}. "
+                "Pass `duplicates='first'`, `duplicates='mean'` or `duplicates='keep'` to `data()` to return the data anyway."
+            )
             raise ValueError(msg)
-    # --- End duplicate checking ---
 
+    return df
+
+
+
+def _format_columns(df, y_source, lookup=False):
+    """
+    Check, rename and reorder the columns of a `data()` response. In geo lookup mode, region names
+    and sources are expected to have been moved to the lookup table already.
+    """
     # Define expected columns based on whether y_source is specified
     if y_source:
         expected_columns = [
@@ -193,6 +297,13 @@ def data(
         ]
     else:
         expected_columns = ["geo", "geo_name", "geo_source", "geo_year", "data_year", "x"]
+    if lookup:
+        expected_columns = [col for col in expected_columns if col not in geo.GEO_COLUMNS]
+
+    # No data for the query (e.g. a combination of filter values that does not exist): the API
+    # returns an empty array, without columns
+    if df.empty and len(df.columns) == 0:
+        df = pd.DataFrame(columns=expected_columns)
 
     missing_columns = [col for col in expected_columns if col not in df.columns]
     if missing_columns:
@@ -211,3 +322,241 @@ def data(
     df = df[[col for col in final_columns if col in df.columns]]
 
     return df
+
+
+def _join_local(x_df, y_df, year):
+    """
+    Assemble a bivariate result from two univariate `data()` results, matching `get_xy_data`: one row
+    per region of x, with `y` missing where y has no value, and both years set to the requested year.
+    """
+    y_df = y_df[["geo", "x"]].rename(columns={"x": "y"})
+    df = x_df.merge(y_df, on="geo", how="left")
+    df["x_year"] = year
+    df["y_year"] = year
+    final_columns = ["geo", "geo_name", "geo_source", "geo_year", "x_year", "y_year", "x", "y"]
+    return df[[col for col in final_columns if col in df.columns]]
+
+
+@with_output
+def data(
+    x_source, y_source=None, year=None, level=None, x_filters=None, y_filters=None, limit=2500, page_size=API_MAX_LIMIT, join=None, duplicates=None, client=None
+):
+    """
+    Fetch univariate or bivariate data for a specific source, year, NUTS level, and selected filters.
+
+    Args:
+        x_source (str): Source name for the x variable.
+        y_source (str, optional): Source name for the y variable. Default is None.
+        year (int): The year for data.
+        level (str): The NUTS level ("0", "1", "2", "3").
+        x_filters (dict): Filters for the x variable as a dictionary of field-value pairs.
+        y_filters (dict, optional): Filters for the y variable as a dictionary of field-value pairs. Default is None.
+        limit (int or None): Maximum number of results to return. Default is 2500. This default should be enough for most uses, 
+                     as it is well above the number of NUTS 3 regions in the EU. Limits above `page_size` are fetched in
+                     several pages, and None fetches all available results.
+        page_size (int): Maximum number of results per request. Default is 10,000, the maximum allowed by the API.
+        join (str, optional): How bivariate data is assembled: "server" to request both variables from the
+                              `get_xy_data` endpoint, or "local" to fetch each variable from `get_x_data` and join
+                              them on `geo` client-side. Default is None, using `mi.options["bivariate_join"]` ("server").
+        duplicates (str, optional): What to do with regions that have several values, usually because not all filters
+                                    were specified: "raise" an error listing the missing filters, keep the "first" row,
+                                    aggregate values by their "mean", or "keep" all rows. Default is None, using
+                                    `mi.options["duplicates"]` ("raise"). Use `find_duplicates()` to inspect them.
+        client (MapineqClient, optional): Client to use for the requests. Default is the shared default client.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing univariate or bivariate data with the following columns:
+
+        - `geo` (str): (NUTS) region code at the requested level.
+        - `geo_name` (str): Name of the (NUTS) region.
+        - `geo_source` (str): Source type of the spatial units (e.g., "NUTS").
+        - `geo_year` (int): Year of the (NUTS) region classification.
+        - `x_year` (int): The year of the predictor variable (X) (renamed from `predictor_year` or `data_year`).
+        - `y_year` (int, optional): The year of the outcome variable (Y) (renamed from `outcome_year`).
+        - `x` (float): The value of the univariate variable.
+        - `y` (float, optional): The value of the y variable (only included when `y_source` is provided).
+
+    Notes:
+        - If `y_source` is **not** provided, the returned DataFrame contains only univariate data (`x`).
+        - If `y_source` **is** provided, the returned DataFrame includes both predictor (`x`) and outcome (`y`) variables.
+        - Some regions may have missing (`NaN`) values for `x` or `y`, indicating unavailable data.
+        - Queries without any data, e.g. for a combination of filter values the source does not have,
+          return an empty DataFrame with the columns above.
+        - Results larger than `page_size` are requested in pages using `offset`, several pages at a time
+          (up to `mi.options["max_concurrency"]`). Use `iter_data()` to process very large results in chunks.
+        - With `join="local"`, each variable is a univariate request that can be served from the on-disk cache
+          (`mi.options["cache"] = True`), so comparing n indicators pairwise costs n downloads instead of n².
+        - With `mi.options["geo_metadata"] = "lookup"`, `geo_name` and `geo_source` are left out and stored once in
+          a table shared by all results, see `geo_lookup()`. Later requests at the same level then ask the API for
+          the remaining columns only.
+
+    Example:
+        # Univariate example
+        >>> import mapineqpy as mi
+        >>> mi.data(
+        ...     x_source="TGS00010",
+        ...     year=2020,
+        ...     level="2",
+        ...     x_filters={"isced11": "TOTAL", "unit": "PC", "age": "Y_GE15", "freq": "A"}
+        ... )
+
+        # Bivariate example
+        >>> import mapineqpy as mi
+        >>> mi.data(
+        ...     x_source="TGS00010",
+        ...     y_source="DEMO_R_MLIFEXP",
+        ...     year=2020,
+        ...     level="2",
+        ...     x_filters={"isced11": "TOTAL", "unit": "PC", "age": "Y_GE15", "freq": "A"},
+        ...     y_filters={"unit": "YR", "age": "Y_LT1", "freq": "A"}
+        ... )
+    """
+    if x_filters is None:
+        x_filters = {}
+    if y_filters is None:
+        y_filters = {}
+    if join is None:
+        join = options.get("bivariate_join", "server")
+    if join not in ("server", "local"):
+        raise ValueError("`join` must be one of 'server', 'local'.")
+    duplicates = _duplicates_mode(duplicates)
+    lookup = geo._geo_metadata_mode() == "lookup"
+
+    function_name, query_params = _prepare_query(
+        x_source, y_source, year, level, x_filters, y_filters, limit, page_size
+    )
+
+    if client is None:
+        client = get_client()
+
+    if y_source and join == "local":
+        # Fetch both variables as univariate data and join them on geo
+        x_df, y_df = _map_concurrent(
+            data.__wrapped__,
+            [
+                {"x_source": source, "year": year, "level": level, "x_filters": filters,
+                 "limit": limit, "page_size": page_size, "duplicates": duplicates, "client": client}
+                for source, filters in [(x_source, x_filters), (y_source, y_filters)]
+            ],
+        )
+        return _join_local(x_df, y_df, year)
+
+    # Perform the HTTP GET requests, parse responses and convert to DataFrame.
+    # In geo lookup mode, once regions of the level are known, leave their metadata out of the
+    # response. Should the response have unknown regions, it is requested again in full.
+    lean = lookup and geo._knows_level(level, client)
+    df = _fetch_frame(
+        client, function_name, _lean_query(query_params, y_source) if lean else query_params, limit, page_size
+    )
+    if lean and "geo_name" not in df.columns and geo._missing(df.get("geo", []), df.get("geo_year", [])):
+        df = _fetch_frame(client, function_name, query_params, limit, page_size)
+
+    with instrument.phase("duplicates", "data"):
+        df = _resolve_duplicates(df, x_source, y_source, year, level, x_filters, y_filters, client, duplicates)
+
+    with instrument.phase("format", "data"):
+        if lookup:
+            df = geo._register(df, level, client)
+        return _format_columns(df, y_source, lookup)
+
+
+@with_output
+def iter_data(
+    x_source, y_source=None, year=None, level=None, x_filters=None, y_filters=None, limit=None, page_size=API_MAX_LIMIT, duplicates=None, client=None
+):
+    """
+    Fetch univariate or bivariate data in chunks, one DataFrame per page of results.
+
+    Takes the same arguments as `data()`, except that `limit` defaults to None, fetching all
+    available results. Only one window of concurrently requested pages is held in memory at a
+    time, so memory use stays flat for very large queries.
+
+    Regions with several values are handled as in `data()`, also when their rows are on different
+    pages: with `duplicates="first"` or `"raise"`, the first value of every region yielded so far
+    is kept for comparison. With `duplicates="mean"`, all pages are fetched before the first chunk
+    is yielded.
+
+    With `mi.options["geo_metadata"] = "lookup"`, region metadata is left out of the requests as in `data()`,
+    and pages with regions not in the lookup table yet are requested again in full.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of at most `page_size` rows, with the same columns as `data()`.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> for chunk in mi.iter_data(
+        ...     x_source="CRIM_GEN_REG",
+        ...     year=2010,
+        ...     level="3",
+        ...     x_filters={"iccs": "ICCS05012"},
+        ...     page_size=1000,
+        ... ):
+        ...     chunk.to_csv("burglaries.csv", mode="a", header=False)
+    """
+    if x_filters is None:
+        x_filters = {}
+    if y_filters is None:
+        y_filters = {}
+    duplicates = _duplicates_mode(duplicates)
+    lookup = geo._geo_metadata_mode() == "lookup"
+
+    function_name, query_params = _prepare_query(
+        x_source, y_source, year, level, x_filters, y_filters, limit, page_size
+    )
+
+    if client is None:
+        client = get_client()
+
+    def resolve(df):
+        return _resolve_duplicates(df, x_source, y_source, year, level, x_filters, y_filters, client, duplicates)
+
+    def fetch_lean_page(client, function_name, params):
+        df, n_rows = _fetch_page(client, function_name, params)
+        if "geo_name" not in df.columns and geo._missing(df.get("geo", []), df.get("geo_year", [])):
+            # Unknown regions, request the page again in full and store their metadata right away,
+            # so that all pages have the same columns
+            params = {key: value for key, value in params.items() if key != "properties"}
+            df, n_rows = _fetch_page(client, function_name, params)
+            df = geo._register(df, level, client)
+        return df, n_rows
+
+    # In geo lookup mode, once regions of the level are known, leave their metadata out of the responses
+    if lookup and geo._knows_level(level, client):
+        pages = _iter_pages(
+            client, function_name, _lean_query(query_params, y_source), limit, page_size, fetch_page=fetch_lean_page
+        )
+    else:
+        pages = _iter_pages(client, function_name, query_params, limit, page_size)
+    frames = (df.copy(deep=False) for df, _ in pages)
+    if duplicates == "mean":
+        # Rows of a region may be on any page, all are needed for the mean
+        with instrument.phase("fetch", "iter_data"):
+            frames = list(frames)
+        if frames:
+            df = resolve(pd.concat(frames, ignore_index=True))
+            frames = [df.iloc[start:start + page_size].reset_index(drop=True) for start in range(0, len(df), page_size)]
+
+    # First row of every region yielded so far, to handle regions whose rows span pages
+    seen = None
+    for df in frames:
+        with instrument.phase("duplicates", "iter_data"):
+            if duplicates in ("first", "raise") and seen is not None:
+                if duplicates == "first":
+                    df = df[~df["geo"].isin(seen["geo"])].reset_index(drop=True)
+                else:
+                    # Raises on regions with different values on this page and on earlier pages
+                    resolve(pd.concat([seen[seen["geo"].isin(df["geo"])], df[seen.columns]], ignore_index=True))
+            if duplicates != "mean":
+                df = resolve(df)
+            if duplicates in ("first", "raise") and not df.empty:
+                first = df[[col for col in ["geo", "x", "y"] if col in df.columns]].drop_duplicates("geo")
+                if seen is not None:
+                    first = pd.concat([seen, first[~first["geo"].isin(seen["geo"])]], ignore_index=True)
+                seen = first
+        if df.empty:
+            continue
+        with instrument.phase("format", "iter_data"):
+            if lookup:
+                df = geo._register(df, level, client)
+            df = _format_columns(df, y_source, lookup)
+        yield df
@@ -0,0 +1,423 @@
+"""
+Bulk export of data to a partitioned Parquet dataset.
+
+An export spec lists queries, each expanded into one `data()` request per year, NUTS level and
+combination of filter values. Requests run concurrently; every result is streamed page by page into
+its own Parquet file under `source=<x_source>/level=<level>/year=<year>/`, so memory use stays bounded
+whatever the size of the export. Completed requests are logged in `_progress.jsonl` in the output
+directory, and an interrupted export resumes where it stopped. `sync()` later brings the export up to
+date, fetching newly covered years and levels and rewriting only the results that changed.
+
+Example spec (JSON, or YAML with pyyaml installed):
+
+    {
+      "output": "exports",
+      "queries": [
+        {"x_source": "CRIM_GEN_REG", "levels": ["2", "3"], "x_filters": {"iccs": ["ICCS05012", "ICCS0401"]}},
+        {"x_source": "TGS00010", "years": [2019, 2020], "levels": "2",
+         "x_filters": {"isced11": "TOTAL", "unit": "PC", "age": "Y_GE15", "freq": "A"}}
+      ]
+    }
+
+`years` and `levels` default to everything the source covers. A list of filter values expands into
+one request per value.
+
+Example:
+    >>> import mapineqpy as mi
+    >>> from mapineqpy.export import export, load_spec, sync
+    >>> export(load_spec("indicators.json"), output="exports")
+    >>> sync(load_spec("indicators.json"), output="exports")  # e.g. nightly
+"""
+
+import copy
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import as_completed
+
+from mapineqpy.client import get_client
+from mapineqpy.concurrency import _get_executor
+from mapineqpy.config import API_MAX_LIMIT
+from mapineqpy.data import _prepare_query, iter_data
+from mapineqpy.memo import clear_metadata_cache
+from mapineqpy.sources import _coverage
+
+PROGRESS_FILE = "_progress.jsonl"
+_QUERY_KEYS = {"x_source", "y_source", "years", "levels", "x_filters", "y_filters", "duplicates"}
+
+
+def load_spec(path):
+    """
+    Read an export spec from a JSON or YAML file.
+
+    Args:
+        path (str): Spec file. Files ending in `.yaml` or `.yml` are read as YAML, which requires pyyaml.
+
+    Returns:
+        dict: The spec, with a `queries` list.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML specs require pyyaml. Install it with `pip install pyyaml`.")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if not isinstance(spec, dict) or not isinstance(spec.get("queries"), list):
+        raise ValueError(f"The spec in '{path}' must be a mapping with a `queries` list.")
+    return spec
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _expand_filters(filters):
+    """
+    Expand list-valued filters into one filter dictionary per combination of values.
+    """
+    filters = filters or {}
+    fields = list(filters)
+    values = [_as_list(filters[field]) for field in fields]
+    return [dict(zip(fields, combination)) for combination in itertools.product(*values)]
+
+
+def plan_export(spec, client=None):
+    """
+    Expand an export spec into the list of `data()` requests to make.
+
+    Args:
+        spec (dict): Export spec, see `mapineqpy.export`.
+        client (MapineqClient, optional): Client used to look up coverage. Default is the shared default client.
+
+    Returns:
+        list: One dictionary of `data()` keyword arguments per request, without duplicates.
+    """
+    if client is None:
+        client = get_client()
+
+    tasks = {}
+    for i, query in enumerate(spec.get("queries", [])):
+        unknown = set(query) - _QUERY_KEYS
+        if unknown:
+            raise ValueError(f"Unknown keys in query {i}: {', '.join(sorted(unknown))}.")
+        x_source = query.get("x_source")
+        if not isinstance(x_source, str) or not x_source:
+            raise ValueError(f"Query {i} must have an `x_source`.")
+        y_source = query.get("y_source")
+
+        covered = _coverage(x_source, client)
+        if not covered:
+            raise ValueError(
+                f"Source '{x_source}' in query {i} has no coverage. You can search sources by running:\n"
+                f"  mi.sources(level='2')"
+            )
+        if y_source is not None:
+            y_covered = _coverage(y_source, client)
+            covered = {level: years & y_covered.get(level, set()) for level, years in covered.items()}
+
+        levels = _as_list(query.get("levels"))
+        levels = sorted(covered) if levels is None else [str(level) for level in levels]
+        years = _as_list(query.get("years"))
+
+        for level in levels:
+            if level not in ["0", "1", "2", "3"]:
+                raise ValueError(f"Invalid level in query {i}: {level}. Must be one of '0', '1', '2', '3'.")
+            level_years = covered.get(level, set())
+            planned = sorted(level_years) if years is None else [int(y) for y in years if int(y) in level_years]
+            for year in planned:
+                for x_filters in _expand_filters(query.get("x_filters")):
+                    for y_filters in _expand_filters(query.get("y_filters")):
+                        task = {
+                            "x_source": x_source,
+                            "y_source": y_source,
+                            "year": year,
+                            "level": level,
+                            "x_filters": x_filters,
+                            "y_filters": y_filters,
+                            "duplicates": query.get("duplicates"),
+                        }
+                        tasks.setdefault(_task_key(task), task)
+    return list(tasks.values())
+
+
+def _task_key(task):
+    return json.dumps(task, sort_keys=True, separators=(",", ":"))
+
+
+def _task_path(output, task):
+    digest = hashlib.sha256(_task_key(task).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(
+        output,
+        f"source={task['x_source']}",
+        f"level={task['level']}",
+        f"year={task['year']}",
+        f"part-{digest}.parquet",
+    )
+
+
+def _write_task(task, path, client, previous_hash=None):
+    """
+    Stream the results of one request into a Parquet file.
+
+    The content hash of the data is computed while writing. If it equals `previous_hash`, the existing
+    file is kept as is. Returns the number of rows, the content hash and whether the file changed.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    x_filters = json.dumps(task["x_filters"], sort_keys=True)
+    y_filters = json.dumps(task["y_filters"], sort_keys=True) if task["y_source"] else None
+    tmp_path = f"{path}.tmp"
+    writer = None
+    rows = 0
+    content_hash = hashlib.sha256()
+    try:
+        for df in iter_data.__wrapped__(**task, client=client):
+            content_hash.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+            df = df.assign(x_filters=x_filters)
+            if y_filters is not None:
+                df = df.assign(y_filters=y_filters)
+            if writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(df)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        raise
+
+    digest = content_hash.hexdigest()
+    if writer is not None:
+        writer.close()
+    if digest == previous_hash and (os.path.exists(path) or writer is None):
+        if writer is not None:
+            os.remove(tmp_path)
+        return rows, digest, False
+    if writer is not None:
+        os.replace(tmp_path, path)
+    elif os.path.exists(path):
+        os.remove(path)  # The request returns no data anymore
+    return rows, digest, True
+
+
+def _revalidate(task, client, validators):
+    """
+    Ask the API whether the first page of a request changed since it was stored, with a conditional
+    request using the stored `ETag` and `Last-Modified` validators. Only the response headers are read.
+
+    Returns:
+        tuple: Whether the response is unchanged (HTTP 304), and the validators of the current response.
+    """
+    function_name, params = _prepare_query(
+        task["x_source"], task["y_source"], task["year"], task["level"],
+        task["x_filters"], task["y_filters"], None, API_MAX_LIMIT,
+    )
+    headers = {}
+    if "etag" in validators:
+        headers["If-None-Match"] = validators["etag"]
+    if "last_modified" in validators:
+        headers["If-Modified-Since"] = validators["last_modified"]
+    with client.get(function_name, dict(params, limit=API_MAX_LIMIT), stream=True, headers=headers) as response:
+        current = {
+            key: response.headers[header]
+            for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+            if header in response.headers
+        }
+        return response.status_code == 304, current
+
+
+def _sync_task(task, output, client, entry=None):
+    """
+    Fetch one request into its Parquet file, or confirm that a stored one is unchanged.
+
+    Returns:
+        tuple: The progress log entry, and "new", "changed" or "unchanged".
+    """
+    path = _task_path(output, task)
+    key = _task_key(task)
+    if entry is None:
+        rows, digest, _ = _write_task(task, path, client)
+        return {"key": key, "rows": rows, "hash": digest}, "new"
+
+    # Probe with a conditional request, unless an earlier probe showed the API sends no validators.
+    # The probe only covers the first page, so results of several pages are always compared by hash.
+    validators = entry.get("validators", {})
+    conditional = entry.get("conditional")
+    if conditional is not False and entry["rows"] < API_MAX_LIMIT:
+        unchanged, current = _revalidate(task, client, validators)
+        if unchanged:
+            return entry, "unchanged"
+        validators, conditional = current, bool(current)
+
+    rows, digest, changed = _write_task(task, path, client, previous_hash=entry.get("hash"))
+    new_entry = {"key": key, "rows": rows, "hash": digest, "validators": validators, "conditional": conditional}
+    return new_entry, "changed" if changed else "unchanged"
+
+
+def _read_progress(output):
+    path = os.path.join(output, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return {}
+    done = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partially written line of an interrupted export
+            done[entry["key"]] = entry  # Later entries of a request replace earlier ones
+    return done
+
+
+def _run(tasks, entries, output, client, progress):
+    """
+    Run `_sync_task` concurrently for every task, appending completed requests to the progress log.
+    Tasks with a progress entry are revalidated, the others are fetched.
+    """
+    from tqdm import tqdm
+
+    summary = {"planned": len(tasks), "new": 0, "changed": 0, "unchanged": 0, "failed": 0, "rows": 0}
+    errors = []
+    executor = _get_executor()
+    futures = {
+        executor.submit(_sync_task, task, output, client, entries.get(_task_key(task))): task for task in tasks
+    }
+    with open(os.path.join(output, PROGRESS_FILE), "a", encoding="utf-8") as log, tqdm(
+        total=len(tasks), unit="request", disable=not progress
+    ) as bar:
+        try:
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    entry, outcome = future.result()
+                except Exception as e:
+                    summary["failed"] += 1
+                    errors.append((task, str(e)))
+                else:
+                    summary[outcome] += 1
+                    if outcome != "unchanged":
+                        summary["rows"] += entry["rows"]
+                    if entry is not entries.get(entry["key"]):
+                        log.write(json.dumps(entry) + "\n")
+                        log.flush()
+                bar.update(1)
+        except BaseException:
+            # Interrupted: drop the requests not started yet, completed ones are already logged
+            for future in futures:
+                future.cancel()
+            raise
+    summary["errors"] = errors
+    return summary
+
+
+def _prepare_output(spec, output, client):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Exporting to Parquet requires pyarrow. Install it with `pip install pyarrow`.")
+    output = output or spec.get("output")
+    if not output:
+        raise ValueError("No output directory given, neither as `output` nor in the spec.")
+    os.makedirs(output, exist_ok=True)
+    return output, client if client is not None else get_client()
+
+
+def export(spec, output=None, resume=True, progress=True, client=None):
+    """
+    Fetch every request of an export spec concurrently into a partitioned Parquet dataset. Requires pyarrow.
+
+    Args:
+        spec (dict): Export spec, see `mapineqpy.export`, e.g. from `load_spec()`.
+        output (str, optional): Output directory. Default is None, using `spec["output"]`.
+        resume (bool): If True (default), skip requests completed by a previous run into the same directory.
+        progress (bool): Show a progress bar. Default is True.
+        client (MapineqClient, optional): Client to use for the requests. Default is the shared default client.
+
+    Returns:
+        dict: Number of planned, skipped, completed and failed requests, rows written, and a list of
+              `(request, error message)` tuples for the failed requests.
+
+    Notes:
+        - At most `mi.options["max_concurrency"]` requests run at the same time.
+        - Failed requests are not logged as completed, so running the export again retries them.
+        - Use `sync()` to also pick up new coverage and changed data in an existing export.
+    """
+    output, client = _prepare_output(spec, output, client)
+    tasks = plan_export(spec, client=client)
+    if resume:
+        done = _read_progress(output)
+    else:
+        done = {}
+        if os.path.exists(os.path.join(output, PROGRESS_FILE)):
+            os.remove(os.path.join(output, PROGRESS_FILE))
+    pending = [task for task in tasks if _task_key(task) not in done]
+
+    summary = _run(pending, {}, output, client, progress)
+    summary["planned"] = len(tasks)
+    summary["skipped"] = len(tasks) - len(pending)
+    summary["completed"] = summary.pop("new") + summary.pop("changed") + summary.pop("unchanged")
+    return summary
+
+
+def sync(spec, output=None, revalidate=True, progress=True, client=None):
+    """
+    Bring an export up to date: fetch requests for newly covered years and levels, and refresh changed data.
+
+    Coverage is looked up again, so years and levels added to a source since the last run are planned
+    and fetched. Requests exported before are revalidated (unless `revalidate` is False):
+
+    - With a conditional request (`If-None-Match` / `If-Modified-Since`), if the API sends `ETag` or
+      `Last-Modified` validators. An unchanged response is then skipped after reading its headers only.
+    - Otherwise the data is downloaded and compared with the content hash stored in the progress log,
+      and the Parquet file is only rewritten if it differs. Whether the API sends validators is learnt
+      on the first revalidation, later runs do not probe again if it does not.
+
+    Args:
+        spec (dict): Export spec, see `mapineqpy.export`, e.g. from `load_spec()`.
+        output (str, optional): Output directory of an earlier `export()`. Default is None, using `spec["output"]`.
+        revalidate (bool): Check requests exported before for changes. Default is True. If False, only new
+                           requests are fetched.
+        progress (bool): Show a progress bar. Default is True.
+        client (MapineqClient, optional): Client to use for the requests. Default is the shared default client.
+
+    Returns:
+        dict: Number of planned, new, changed, unchanged and failed requests, of `stale` requests (exported
+              before but no longer covered, their files are kept), rows written, and a list of
+              `(request, error message)` tuples for the failed requests.
+
+    Notes:
+        - Responses are not served from the on-disk cache during a sync (`cache_bypass` of the client), but
+          fresh responses are still stored in it. Other calls made meanwhile use the cache as usual.
+
+    Example:
+        >>> from mapineqpy.export import load_spec, sync
+        >>> sync(load_spec("indicators.json"))
+    """
+    output, client = _prepare_output(spec, output, client)
+    clear_metadata_cache("source_coverage")
+    planned = plan_export(spec, client=client)
+    entries = _read_progress(output)
+    tasks = planned if revalidate else [task for task in planned if _task_key(task) not in entries]
+
+    # Bypass the cache for the requests of this sync only, on a copy sharing the connections of `client`
+    client = copy.copy(client)
+    client.cache_bypass = True
+    summary = _run(tasks, entries, output, client, progress)
+
+    summary["planned"] = len(planned)
+    summary["stale"] = len(set(entries) - {_task_key(task) for task in planned})
+    return summary
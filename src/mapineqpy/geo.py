@@ -0,0 +1,92 @@
+"""
+Shared lookup table of region metadata, used when `mi.options["geo_metadata"]` is "lookup".
+
+The API repeats the name and source of each region on every row of every data response. In lookup
+mode, `data()` and `iter_data()` return only `geo` and `geo_year` for the regions, and their names and
+sources are stored once here, whatever the number of indicators and years fetched. Join them back when
+needed with `mi.geo_lookup()`.
+
+Example:
+    >>> import mapineqpy as mi
+    >>> mi.options["geo_metadata"] = "lookup"
+    >>> dfs = mi.data_many(specs)
+    >>> df = dfs[0].merge(mi.geo_lookup(), on=["geo", "geo_year"], how="left")
+"""
+
+import threading
+
+from mapineqpy.options import options
+
+# Columns moved from data frames to the lookup table
+GEO_COLUMNS = ["geo_name", "geo_source"]
+
+_lookup = {}
+# NUTS levels (per API endpoint) with regions in the lookup table, requested without their metadata
+_levels = set()
+_lock = threading.Lock()
+
+
+def _geo_metadata_mode():
+    mode = options.get("geo_metadata", "columns")
+    if mode not in ("columns", "lookup"):
+        raise ValueError("`options['geo_metadata']` must be one of 'columns', 'lookup'.")
+    return mode
+
+
+def _register(df, level=None, client=None):
+    """
+    Store the metadata of the regions in `df`, and return `df` without it.
+    """
+    if not all(col in df.columns for col in ["geo", "geo_year", *GEO_COLUMNS]):
+        return df
+    rows = df[["geo", "geo_year", *GEO_COLUMNS]].drop_duplicates(["geo", "geo_year"])
+    with _lock:
+        for geo, geo_year, geo_name, geo_source in rows.itertuples(index=False):
+            _lookup[(geo, geo_year)] = (geo_name, geo_source)
+        if level is not None and client is not None and len(rows):
+            _levels.add((client.base_api_endpoint, level))
+    return df.drop(columns=GEO_COLUMNS)
+
+
+def _knows_level(level, client):
+    with _lock:
+        return (client.base_api_endpoint, level) in _levels
+
+
+def _missing(geos, geo_years):
+    """
+    Return whether some regions are not in the lookup table.
+    """
+    with _lock:
+        return any(key not in _lookup for key in zip(geos, geo_years))
+
+
+def geo_lookup():
+    """
+    Return the metadata of all regions seen in lookup mode (`mi.options["geo_metadata"] = "lookup"`).
+
+    Returns:
+        pd.DataFrame: One row per region and classification year, with the columns `geo`, `geo_year`,
+        `geo_name` and `geo_source`. Merge it with data on `geo` and `geo_year`.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.geo_lookup().query("geo_year == 2021")
+    """
+    import pandas as pd
+
+    with _lock:
+        items = list(_lookup.items())
+    return pd.DataFrame(
+        [(geo, geo_year, geo_name, geo_source) for (geo, geo_year), (geo_name, geo_source) in items],
+        columns=["geo", "geo_year", *GEO_COLUMNS],
+    )
+
+
+def clear_geo_lookup():
+    """
+    Empty the region lookup table.
+    """
+    with _lock:
+        _lookup.clear()
+        _levels.clear()
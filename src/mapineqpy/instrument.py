@@ -0,0 +1,315 @@
+"""
+Instrumentation of API requests and of the processing phases of `data()`.
+
+Hooks are callables receiving one event dictionary per completed request or phase. They are only
+invoked (and events only built) while at least one hook is registered.
+
+Request events (`event["event"] == "request"`) have the keys:
+
+- `function_name` (str) and `params` (dict): the API function and query parameters.
+- `status` (int or None): HTTP status of the final attempt, None if served without network access.
+- `bytes` (int): Size of the response body downloaded, 0 if served from the cache or a snapshot.
+- `wire_bytes` (int): Size of the body as received on the network, before decompression.
+- `encoding` (str or None): `Content-Encoding` of the response, e.g. "gzip" or "identity"; None without network access.
+- `retries` (int): Number of retried attempts.
+- `cache` (str): "hit", "miss" or "off"; "replay" when served from a snapshot.
+- `start` (float): Start time, as `time.time()`.
+- `elapsed` (float): Total duration in seconds, broken down into:
+- `wait` (float): Time spent waiting for the rate limiter and between retries.
+- `network` (float): Time spent on requests and downloading bodies.
+- `parse` (float): Time spent decoding the JSON body (into columns, for streamed responses).
+
+Phase events (`event["event"] == "phase"`) have the keys `phase` ("fetch", "frame", "duplicates",
+"format" or "convert"), `function_name` (e.g. "data"), `start` and `elapsed`.
+
+Example:
+    >>> import mapineqpy as mi
+    >>> with mi.collect_stats() as stats:
+    ...     dfs = mi.data_many(specs)
+    >>> stats.summary()
+    >>> stats.requests_frame().groupby("function_name")["network"].describe()
+"""
+
+import contextlib
+import threading
+import time
+from collections import defaultdict
+
+_hooks = []
+_local = threading.local()
+
+
+def add_hook(hook):
+    """
+    Register a callable to receive instrumentation events. See the `mapineqpy.instrument` module for the events.
+
+    Hooks are called synchronously from the thread that made the request, so they should be fast and
+    thread-safe. Exceptions raised by hooks propagate to the caller.
+
+    Args:
+        hook (callable): Function taking one event dictionary.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.add_hook(lambda event: print(event["event"], event["elapsed"]))
+    """
+    if not callable(hook):
+        raise ValueError("`hook` must be callable.")
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Unregister a hook added with `add_hook()`.
+    """
+    try:
+        _hooks.remove(hook)
+    except ValueError:
+        raise ValueError("`hook` is not registered.")
+
+
+def emit(event):
+    """
+    Send an event to all registered hooks.
+    """
+    for hook in list(_hooks):
+        hook(event)
+
+
+def current_request():
+    """
+    Return the request event being built in this thread, or None.
+    """
+    return getattr(_local, "request", None)
+
+
+@contextlib.contextmanager
+def request(function_name, params):
+    """
+    Build a request event while the `with` block runs, and emit it when the block exits.
+
+    Yields the event dictionary, or None if no hook is registered.
+    """
+    if not _hooks:
+        yield None
+        return
+    event = {
+        "event": "request",
+        "function_name": function_name,
+        "params": dict(params or {}),
+        "status": None,
+        "bytes": 0,
+        "wire_bytes": 0,
+        "encoding": None,
+        "retries": 0,
+        "cache": "off",
+        "start": time.time(),
+        "elapsed": 0.0,
+        "wait": 0.0,
+        "network": 0.0,
+        "parse": 0.0,
+    }
+    started = time.perf_counter()
+    try:
+        yield event
+    finally:
+        event["elapsed"] = time.perf_counter() - started
+        emit(event)
+
+
+@contextlib.contextmanager
+def tracking(event):
+    """
+    Make `event` the current request event of this thread while the `with` block runs, so that
+    `MapineqClient.get()` records attempts, status and timings into it.
+    """
+    outer = current_request()
+    _local.request = event
+    try:
+        yield
+    finally:
+        _local.request = outer
+
+
+@contextlib.contextmanager
+def phase(name, function_name):
+    """
+    Emit a phase event timing the `with` block, if any hook is registered.
+    """
+    if not _hooks:
+        yield
+        return
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit(
+            {
+                "event": "phase",
+                "phase": name,
+                "function_name": function_name,
+                "start": start,
+                "elapsed": time.perf_counter() - started,
+            }
+        )
+
+
+def timed_chunks(chunks, event):
+    """
+    Pass byte chunks through, adding the time spent waiting for them to `event["network"]`
+    and their size to `event["bytes"]`.
+    """
+    chunks = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            event["network"] += time.perf_counter() - started
+            return
+        event["network"] += time.perf_counter() - started
+        event["bytes"] += len(chunk)
+        yield chunk
+
+
+class Stats:
+    """
+    Collect instrumentation events and aggregate them across a run.
+
+    A `Stats` instance is a hook: register it with `add_hook()`, or use `collect_stats()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = []
+        self.phases = []
+
+    def __call__(self, event):
+        with self._lock:
+            if event["event"] == "request":
+                self.requests.append(event)
+            else:
+                self.phases.append(event)
+
+    def summary(self):
+        """
+        Aggregate the collected events.
+
+        Returns:
+            dict: Number of requests, bytes (decompressed and on the wire), retries, cache hits and misses,
+                  status and encoding counts, and total seconds per request timing (`elapsed`, `wait`,
+                  `network`, `parse`) and per phase.
+        """
+        with self._lock:
+            requests, phases = list(self.requests), list(self.phases)
+        status = defaultdict(int)
+        cache = defaultdict(int)
+        encoding = defaultdict(int)
+        for event in requests:
+            status[event["status"]] += 1
+            cache[event["cache"]] += 1
+            if event["encoding"] is not None:
+                encoding[event["encoding"]] += 1
+        phase_seconds = defaultdict(float)
+        for event in phases:
+            phase_seconds[event["phase"]] += event["elapsed"]
+        return {
+            "requests": len(requests),
+            "bytes": sum(event["bytes"] for event in requests),
+            "wire_bytes": sum(event["wire_bytes"] for event in requests),
+            "retries": sum(event["retries"] for event in requests),
+            "cache_hits": cache["hit"],
+            "cache_misses": cache["miss"],
+            "status": dict(status),
+            "encoding": dict(encoding),
+            "seconds": {
+                key: sum(event[key] for event in requests) for key in ("elapsed", "wait", "network", "parse")
+            },
+            "phase_seconds": dict(phase_seconds),
+        }
+
+    def requests_frame(self):
+        """
+        Return the request events as a DataFrame, one row per request.
+        """
+        import pandas as pd
+
+        with self._lock:
+            return pd.DataFrame(self.requests)
+
+    def phases_frame(self):
+        """
+        Return the phase events as a DataFrame, one row per phase.
+        """
+        import pandas as pd
+
+        with self._lock:
+            return pd.DataFrame(self.phases)
+
+    def clear(self):
+        with self._lock:
+            self.requests.clear()
+            self.phases.clear()
+
+
+@contextlib.contextmanager
+def collect_stats():
+    """
+    Collect instrumentation events while the `with` block runs.
+
+    Yields:
+        Stats: The collector; see `Stats.summary()`, `Stats.requests_frame()` and `Stats.phases_frame()`.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> with mi.collect_stats() as stats:
+        ...     mi.panel("CRIM_GEN_REG", level="2", x_filters={"iccs": "ICCS05012"})
+        >>> stats.summary()["seconds"]
+    """
+    stats = Stats()
+    add_hook(stats)
+    try:
+        yield stats
+    finally:
+        remove_hook(stats)
+
+
+def opentelemetry_hook(tracer=None):
+    """
+    Return a hook that records every event as an OpenTelemetry span. Requires `opentelemetry-api`.
+
+    Args:
+        tracer (opentelemetry.trace.Tracer, optional): Tracer to create spans with. Default is None,
+                                                       using the tracer of the global tracer provider.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.add_hook(mi.instrument.opentelemetry_hook())
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        raise ImportError(
+            "OpenTelemetry spans require opentelemetry-api. Install it with `pip install opentelemetry-api`."
+        )
+    if tracer is None:
+        tracer = trace.get_tracer("mapineqpy")
+
+    def hook(event):
+        start = int(event["start"] * 1e9)
+        if event["event"] == "request":
+            name = f"mapineqpy {event['function_name']}"
+            attributes = {
+                key: event[key]
+                for key in ("function_name", "bytes", "wire_bytes", "retries", "cache", "wait", "network", "parse")
+            }
+            if event["status"] is not None:
+                attributes["http.status_code"] = event["status"]
+        else:
+            name = f"mapineqpy {event['function_name']}.{event['phase']}"
+            attributes = {"phase": event["phase"], "function_name": event["function_name"]}
+        span = tracer.start_span(name, start_time=start, attributes=attributes)
+        span.end(end_time=start + int(event["elapsed"] * 1e9))
+
+    return hook
@@ -1,12 +1,16 @@
 # File: mapineqpy/functions.py
 
-import requests
-from mapineqpy.config import BASE_API_ENDPOINT, USER_AGENT
+from mapineqpy.client import get_client
+from mapineqpy.memo import memoize
 
-def nuts_levels():
+@memoize
+def nuts_levels(client=None):
     """
     Get a list of available NUTS levels.
 
+    Args:
+        client (MapineqClient, optional): Client to use for the request. Default is the shared default client.
+
     Returns:
         list: A list of valid NUTS levels as strings that will be accepted by other functions.
 
@@ -14,21 +18,9 @@ def nuts_levels():
         >>> get_nuts_levels()
         ['3', '2', '1', '0']
     """
-    # Construct the full URL
-    url_endpoint = f"{BASE_API_ENDPOINT}get_levels/items.json"
-
-    # Perform the HTTP GET request
-    response = requests.get(
-        url_endpoint,
-        headers={
-            "Content-Type": "application/json",
-            "User-Agent": USER_AGENT,
-        },
-    )
-
-    # Raise an error for bad responses
-    response.raise_for_status()
+    if client is None:
+        client = get_client()
 
-    # Parse and return the JSON response
-    response_data = response.json()
+    # Perform the HTTP GET request and parse the JSON response
+    response_data = client.get_json("get_levels")
     return [item["f_level"] for item in response_data]
@@ -0,0 +1,105 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+from mapineqpy.options import options
+from mapineqpy.singleflight import single_flight
+from mapineqpy.snapshot import get_recorder
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _freeze(value):
+    """
+    Turn an argument into a hashable value, independent of dictionary ordering.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _copy(result):
+    # Callers may modify the returned frames or lists, never hand out the stored object itself
+    if hasattr(result, "copy"):
+        return result.copy()
+    return result
+
+
+def memoize(func):
+    """
+    Memoize a metadata function in memory, keyed on its normalized arguments.
+
+    The number of stored results is bounded by `mi.options["memoize_max_size"]`, least recently
+    used results are dropped first. Set `mi.options["memoize"] = False` to disable.
+    Stored results are invalidated with `clear_metadata_cache()`. Identical calls made concurrently
+    (from threads or async tasks) share a single request, also with memoizing disabled. While a snapshot
+    is recorded, neither applies, so that every response reaches the snapshot.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if get_recorder() is not None:
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        client = arguments.pop("client", None)
+        if client is None:
+            from mapineqpy.client import get_client
+
+            client = get_client()
+        key = (
+            func.__name__,
+            client.base_api_endpoint,
+            tuple((name, _freeze(value)) for name, value in arguments.items()),
+        )
+
+        memoize = options.get("memoize", True)
+        if memoize:
+            with _memo_lock:
+                if key in _memo:
+                    _memo.move_to_end(key)
+                    return _copy(_memo[key])
+
+        # Identical concurrent calls wait for the first one instead of repeating the request
+        result = single_flight.do(key, func, *args, **kwargs)
+        if not memoize:
+            return _copy(result)
+
+        max_size = options.get("memoize_max_size", 256)
+        with _memo_lock:
+            _memo[key] = result
+            _memo.move_to_end(key)
+            while len(_memo) > max_size:
+                _memo.popitem(last=False)
+        # The result may be shared with concurrent callers, hand out copies only
+        return _copy(result)
+
+    return wrapper
+
+
+def clear_metadata_cache(function_name=None):
+    """
+    Invalidate in-memory results of metadata functions.
+
+    Args:
+        function_name (str, optional): Only invalidate results of this function, one of
+                                       "nuts_levels", "sources", "source_coverage", "source_filters".
+                                       Default is None, invalidating everything.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.clear_metadata_cache("source_filters")
+    """
+    with _memo_lock:
+        if function_name is None:
+            _memo.clear()
+        else:
+            for key in [key for key in _memo if key[0] == function_name]:
+                del _memo[key]
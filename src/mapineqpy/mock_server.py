@@ -0,0 +1,286 @@
+"""
+Local stand-in for the Mapineq API, serving synthetic data.
+
+Useful for tests and benchmarks that should not depend on the live API. The server implements the
+endpoints used by the package with deterministic, size-configurable data, and can inject latency and
+transient errors.
+
+Example:
+    >>> import mapineqpy as mi
+    >>> from mapineqpy.mock_server import MockServer
+    >>> with MockServer(n_regions=1500, latency=0.01) as server:
+    ...     client = server.client()
+    ...     df = client.data(x_source="SRC000", year=2020, level="3", x_filters={"category": "C0"})
+"""
+
+import gzip
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from mapineqpy.client import MapineqClient
+
+LEVELS = ["3", "2", "1", "0"]
+
+
+class MockServer:
+    """
+    Synthetic Mapineq API served over HTTP on localhost, in a background thread.
+
+    Every source has three filter fields: `unit` and `freq` with a single value each, and `category` with
+    `n_categories` values. As with the real API, data requests that leave `category` unspecified return
+    one row per category and region, i.e. duplicate regions.
+
+    Args:
+        n_regions (int): Number of regions at every NUTS level. Default is 300.
+        n_sources (int): Number of sources, named "SRC000", "SRC001", ... Default is 10.
+        years (iterable of int): Years covered by every source. Default is 2010 to 2020.
+        n_categories (int): Number of values of the `category` filter field. Default is 3.
+        latency (float): Delay in seconds added to every request. Default is 0.
+        error_rate (float): Probability that a request fails with `error_status`. Default is 0.
+        error_status (int): Status of injected errors. Default is 503.
+        max_limit (int): Maximum number of rows per response, like the real API. Default is 10,000.
+        seed (int): Seed of the synthetic values and injected errors. Default is 0.
+        port (int): Port to listen on. Default is 0, picking a free port.
+        etag (bool): Send an `ETag` with every response and answer matching `If-None-Match` requests with
+                     304 Not Modified. Default is False, like the real API.
+        compress (bool): Gzip response bodies for clients accepting it, like the real API. Default is True.
+
+    Attributes:
+        version (int): Mixed into all synthetic values. Increment it to simulate changed data.
+    """
+
+    def __init__(
+        self,
+        n_regions=300,
+        n_sources=10,
+        years=range(2010, 2021),
+        n_categories=3,
+        latency=0.0,
+        error_rate=0.0,
+        error_status=503,
+        max_limit=10000,
+        seed=0,
+        port=0,
+        etag=False,
+        compress=True,
+    ):
+        self.n_regions = n_regions
+        self.sources = [f"SRC{i:03d}" for i in range(n_sources)]
+        self.years = list(years)
+        self.categories = [f"C{i}" for i in range(n_categories)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_limit = max_limit
+        self.seed = seed
+        self.etag = etag
+        self.compress = compress
+        self.version = 0
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"mock": self})
+        self._server = _Server(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_api_endpoint(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/functions/postgisftw."
+
+    def start(self):
+        """
+        Start serving in a background thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and release the port.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def client(self, **kwargs):
+        """
+        Return a `MapineqClient` pointed at this server. Keyword arguments are passed to the client.
+        """
+        return MapineqClient(base_api_endpoint=self.base_api_endpoint, **kwargs)
+
+    # Synthetic data
+
+    def _regions(self, level):
+        return [(f"R{level}{i:05d}", f"Region {level}-{i}") for i in range(self.n_regions)]
+
+    def _value(self, *key):
+        return (zlib.crc32(json.dumps(key).encode("utf-8")) % 100000) / 100.0
+
+    def _fields(self):
+        return [
+            ("unit", "Unit of measure", [("NR", "Number")]),
+            ("freq", "Time frequency", [("A", "Annual")]),
+            ("category", "Category", [(c, f"Category {c}") for c in self.categories]),
+        ]
+
+    def _rows(self, spec, year, level):
+        source = spec.get("source")
+        if source not in self.sources or year not in self.years:
+            return []
+        conditions = {c["field"]: c["value"] for c in spec.get("conditions", [])}
+        # Unspecified multi-valued fields yield one row per value, like the real API
+        categories = [conditions["category"]] if "category" in conditions else self.categories
+        return [
+            (geo, name, self._value(source, year, level, geo, category, self.version))
+            for geo, name in self._regions(level)
+            for category in categories
+        ]
+
+    def respond(self, function_name, query):
+        """
+        Build the JSON body of an API function for the given query parameters.
+        """
+        limit = min(int(query.get("limit", self.max_limit)), self.max_limit)
+        offset = int(query.get("offset", 0))
+
+        if function_name == "get_levels":
+            return [{"f_level": level} for level in LEVELS]
+        if function_name in ("get_source_by_nuts_level", "get_source_by_year_nuts_level"):
+            if "_year" in query and int(query["_year"]) not in self.years:
+                return []
+            items = [
+                {"f_resource": s, "f_short_description": f"Source {s}", "f_description": f"Synthetic source {s}"}
+                for s in self.sources
+            ]
+        elif function_name == "get_year_nuts_level_from_source":
+            if query.get("_resource") not in self.sources:
+                return []
+            items = [{"f_level": level, "f_year": year} for level in LEVELS for year in self.years]
+        elif function_name == "get_column_values_source_json":
+            if query.get("_resource") not in self.sources:
+                return []
+            items = [
+                {
+                    "field": field,
+                    "field_label": label,
+                    "field_values": [{"value": value, "label": value_label} for value, value_label in values],
+                }
+                for field, label, values in self._fields()
+            ]
+        elif function_name == "get_x_data":
+            year = int(query["_year"])
+            level = query["_level"]
+            items = [
+                {"geo": geo, "geo_name": name, "geo_source": "NUTS", "geo_year": 2021, "data_year": year, "x": x}
+                for geo, name, x in self._rows(json.loads(query["X_JSON"]), year, level)
+            ]
+        elif function_name == "get_xy_data":
+            x_year = int(query["_predictor_year"])
+            y_year = int(query["_outcome_year"])
+            level = query["_level"]
+            x_rows = self._rows(json.loads(query["X_JSON"]), x_year, level)
+            y_spec = json.loads(query["Y_JSON"]) if "Y_JSON" in query else {}
+            y_values = {}
+            for geo, _, y in self._rows(y_spec, y_year, level):
+                y_values.setdefault(geo, y)
+            items = [
+                {
+                    "geo": geo, "geo_name": name, "geo_source": "NUTS", "geo_year": 2021,
+                    "predictor_year": x_year, "outcome_year": y_year, "x": x, "y": y_values.get(geo),
+                }
+                for geo, name, x in x_rows
+            ]
+        else:
+            raise KeyError(function_name)
+
+        items = list(itertools.islice(items, offset, offset + limit))
+        if "properties" in query and function_name in ("get_x_data", "get_xy_data"):
+            properties = query["properties"].split(",")
+            items = [{key: item[key] for key in properties if key in item} for item in items]
+        return items
+
+    def _should_fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients closing streamed responses early reset the connection, which is not an error here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid the delayed-ACK stall on keep-alive connections
+    disable_nagle_algorithm = True
+    mock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        function_name = url.path.rsplit("postgisftw.", 1)[-1].split("/", 1)[0]
+        mock = self.mock
+        with mock._lock:
+            mock.requests[function_name] += 1
+
+        if mock.latency:
+            time.sleep(mock.latency)
+        if mock._should_fail():
+            self._send(mock.error_status, headers={"Retry-After": "0"})
+            return
+
+        try:
+            items = mock.respond(function_name, query)
+        except KeyError:
+            self._send(404, b'{"message":"function not found"}')
+            return
+        except (ValueError, TypeError) as e:
+            self._send(400, json.dumps({"message": str(e)}).encode("utf-8"))
+            return
+        body = json.dumps(items).encode("utf-8")
+        headers = {}
+        if mock.etag:
+            etag = f'"{zlib.crc32(body):08x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, headers={"ETag": etag})
+                return
+            headers["ETag"] = etag
+        if mock.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers=headers)
@@ -1,3 +1,31 @@
 options = {
     "skip_filter_check": False,  # Default: perform filter checks
+    "max_concurrency": 8,  # Maximum number of concurrent requests in async and bulk functions
+    "duplicates": "raise",  # Regions with several values in data(): "raise", "first", "mean" or "keep"
+    "dtypes": "default",  # "default" (as inferred from the API) or "compact" (categories, small ints)
+    "float_dtype": "float64",  # dtype of values in compact mode: "float64" or "float32"
+    "backend": "pandas",  # DataFrame type returned: "pandas", "pyarrow" (pyarrow-backed pandas) or "polars"
+    "bivariate_join": "server",  # "server" (get_xy_data) or "local" (join univariate get_x_data results on geo)
+    "compression": True,  # Accept compressed responses (gzip, deflate, and brotli/zstd when their decoders are installed)
+    "geo_metadata": "columns",  # Region names and sources in data(): "columns" or "lookup" (stored once, see geo_lookup())
+    "stream_json": False,  # Parse responses incrementally while downloading: ~40% less peak memory, ~1.6x parse time
+    "memoize": True,  # Keep results of metadata functions (sources, source_filters, ...) in memory
+    "memoize_max_size": 256,  # Maximum number of metadata results kept in memory
+    "catalog_path": None,  # Location of the local catalog, None for catalog.sqlite in the cache directory
+    "retries": 3,  # Number of retries of requests failing with a connection error, timeout, 429 or 5xx
+    "backoff_factor": 0.5,  # Base delay in seconds of the exponential backoff between retries
+    "backoff_max": 60,  # Maximum delay in seconds between retries
+    "rate_limit": None,  # Maximum requests per second shared by all threads and tasks, None for no limit
+    "coalesce": True,  # Identical concurrent requests share one upstream call
+    "replay": None,  # Path of a snapshot (see record_snapshot()) to serve all requests from, without network access
+    "cache": False,  # Store API responses in a persistent on-disk cache
+    "cache_bypass": False,  # Ignore cached responses and refetch (fresh responses are still stored)
+    "cache_dir": None,  # Cache directory, None for ~/.cache/mapineqpy (or $XDG_CACHE_HOME/mapineqpy)
+    "cache_max_size": 512 * 1024 * 1024,  # Maximum cache size in bytes, least recently used entries are evicted
+    "cache_ttl": {  # Time to live of cached responses in seconds, per API function, None for no expiry
+        "get_x_data": 30 * 24 * 3600,
+        "get_xy_data": 30 * 24 * 3600,
+        "get_column_values_source_json": 30 * 24 * 3600,
+        "default": 24 * 3600,
+    },
 }
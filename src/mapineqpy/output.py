@@ -0,0 +1,111 @@
+import functools
+import inspect
+
+import pandas as pd
+
+from mapineqpy import instrument
+from mapineqpy.options import options
+
+# Columns holding years, stored as small integers in compact mode
+YEAR_COLUMNS = ["year", "geo_year", "x_year", "y_year"]
+
+# Columns holding indicator values
+VALUE_COLUMNS = ["x", "y"]
+
+
+def _compact(df, float_dtype):
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if col in VALUE_COLUMNS:
+            df[col] = pd.to_numeric(series, errors="coerce").astype(float_dtype)
+        elif col in YEAR_COLUMNS:
+            years = pd.to_numeric(series, errors="coerce")
+            if years.isna().sum() != series.isna().sum():
+                continue  # Not purely numeric, keep as is
+            df[col] = years.astype("int16" if not years.isna().any() else "Int16")
+        elif pd.api.types.is_string_dtype(series) or series.dtype == object:
+            # Categories only pay off when values repeat
+            if len(series) and series.nunique(dropna=True) <= len(series) / 2:
+                df[col] = series.astype("category")
+    return df
+
+
+def convert_output(df, dtypes=None, backend=None, float_dtype=None):
+    """
+    Convert a DataFrame returned by the package to compact dtypes and/or another DataFrame backend.
+
+    Args:
+        df (pd.DataFrame): A DataFrame returned by `data()`, `panel()`, `sources()`, ...
+        dtypes (str, optional): "default" to keep the dtypes inferred from the API response, or "compact" to
+                                store repetitive strings as `category`, years as 16-bit integers and values as
+                                `float_dtype`. Default is None, using `mi.options["dtypes"]`.
+        backend (str, optional): "pandas", "pyarrow" (pandas with pyarrow-backed columns) or "polars".
+                                 Default is None, using `mi.options["backend"]`.
+        float_dtype (str, optional): "float64" or "float32", dtype of `x` and `y` in compact mode.
+                                     Default is None, using `mi.options["float_dtype"]`.
+
+    Returns:
+        pd.DataFrame or polars.DataFrame: The converted DataFrame.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> mi.options.update(dtypes="compact", float_dtype="float32")
+        >>> df = mi.panel("CRIM_GEN_REG", level="2", x_filters={"iccs": "ICCS05012"})
+    """
+    if dtypes is None:
+        dtypes = options.get("dtypes", "default")
+    if backend is None:
+        backend = options.get("backend", "pandas")
+    if float_dtype is None:
+        float_dtype = options.get("float_dtype", "float64")
+
+    if dtypes not in ("default", "compact"):
+        raise ValueError("`dtypes` must be one of 'default', 'compact'.")
+    if backend not in ("pandas", "pyarrow", "polars"):
+        raise ValueError("`backend` must be one of 'pandas', 'pyarrow', 'polars'.")
+    if float_dtype not in ("float64", "float32"):
+        raise ValueError("`float_dtype` must be one of 'float64', 'float32'.")
+
+    if dtypes == "compact":
+        df = _compact(df, float_dtype)
+
+    if backend == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("The 'pyarrow' backend requires pyarrow. Install it with `pip install pyarrow`.")
+        # Categories stay categorical, all other columns become pyarrow-backed
+        return df.convert_dtypes(dtype_backend="pyarrow")
+    if backend == "polars":
+        try:
+            import polars as pl
+        except ImportError:
+            raise ImportError("The 'polars' backend requires polars. Install it with `pip install polars pyarrow`.")
+        return pl.from_pandas(df)
+    return df
+
+
+def with_output(func):
+    """
+    Apply `convert_output()` with the options in `mi.options` to the DataFrame(s) a function returns.
+
+    The unconverted function stays available as `func.__wrapped__`, for use inside the package.
+    """
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            for df in func(*args, **kwargs):
+                with instrument.phase("convert", func.__name__):
+                    df = convert_output(df)
+                yield df
+
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        df = func(*args, **kwargs)
+        with instrument.phase("convert", func.__name__):
+            return convert_output(df)
+
+    return wrapper
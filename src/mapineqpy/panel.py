@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from mapineqpy.client import get_client
+from mapineqpy.concurrency import _map_concurrent
+from mapineqpy.data import data
+from mapineqpy.output import with_output
+from mapineqpy.sources import source_coverage
+
+
+def _covered_years(source_name, level, client):
+    coverage = source_coverage.__wrapped__(source_name, client=client)
+    covered = coverage[coverage["nuts_level"].astype(str) == level]
+    return set(int(year) for year in covered["year"])
+
+
+@with_output
+def panel(
+    x_source, years=None, level=None, x_filters=None, y_source=None, y_filters=None, shape="long", limit=2500, client=None
+):
+    """
+    Fetch one indicator (or a pair of indicators) for many years as a single panel.
+
+    The years to request are planned from `source_coverage()`: years the source(s) do not cover at the
+    requested NUTS level are skipped. The remaining years are fetched concurrently with `data()`.
+
+    Args:
+        x_source (str): Source name for the x variable.
+        years (iterable of int, optional): Years to fetch, e.g. `range(2010, 2021)`. Default is None,
+                                           fetching all years covered by the source(s) at `level`.
+        level (str): The NUTS level ("0", "1", "2", "3").
+        x_filters (dict, optional): Filters for the x variable as a dictionary of field-value pairs.
+        y_source (str, optional): Source name for the y variable. Default is None.
+        y_filters (dict, optional): Filters for the y variable as a dictionary of field-value pairs.
+        shape (str): "long" (default) for one row per region and year, or "wide" for one row per
+                     region and one column per variable and year.
+        limit (int): Maximum number of results per year, passed to `data()`. Default is 2500.
+        client (MapineqClient, optional): Client to use for the requests. Default is the shared default client.
+
+    Returns:
+        pd.DataFrame: In "long" shape, the columns of `data()` preceded by `year`, the requested year.
+        In "wide" shape, `geo` and `geo_name` followed by `x_<year>` (and `y_<year>`) columns.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> df = mi.panel(
+        ...     x_source="CRIM_GEN_REG",
+        ...     years=range(2008, 2011),
+        ...     level="2",
+        ...     x_filters={"iccs": "ICCS05012"},
+        ... )
+    """
+    if shape not in ("long", "wide"):
+        raise ValueError("`shape` must be one of 'long', 'wide'.")
+    if level not in ["0", "1", "2", "3"]:
+        raise ValueError(f"Invalid `level`: {level}. Must be one of '0', '1', '2', '3'.")
+    if client is None:
+        client = get_client()
+
+    covered = _covered_years(x_source, level, client)
+    if y_source is not None:
+        covered &= _covered_years(y_source, level, client)
+
+    if years is None:
+        planned = sorted(covered)
+    else:
+        years = list(years)
+        if not all(isinstance(year, int) for year in years):
+            raise ValueError("`years` must be integers.")
+        planned = [year for year in sorted(set(years)) if year in covered]
+
+    if not planned:
+        raise ValueError(
+            f"No requested years are covered at NUTS level '{level}'. You can review the coverage by running:\n"
+            f"  mi.source_coverage('{x_source}')"
+        )
+
+    frames = _map_concurrent(
+        data.__wrapped__,
+        [
+            {
+                "x_source": x_source,
+                "y_source": y_source,
+                "year": year,
+                "level": level,
+                "x_filters": x_filters,
+                "y_filters": y_filters,
+                "limit": limit,
+                "client": client,
+            }
+            for year in planned
+        ],
+    )
+
+    if shape == "long":
+        # Concatenate once, with the requested year repeated per frame, instead of growing a frame per year
+        df = pd.concat(frames, ignore_index=True)
+        df.insert(0, "year", np.repeat(planned, [len(frame) for frame in frames]))
+        return df
+
+    value_columns = ["x", "y"] if y_source is not None else ["x"]
+    columns = {}
+    for year, frame in zip(planned, frames):
+        frame = frame.drop_duplicates("geo").set_index("geo")
+        for column in value_columns:
+            columns[f"{column}_{year}"] = frame[column]
+    # In geo lookup mode, frames carry no region names
+    name_columns = [col for col in ["geo", "geo_name"] if col in frames[0].columns]
+    names = pd.concat([frame[name_columns] for frame in frames]).drop_duplicates("geo")
+    df = pd.DataFrame(columns)
+    df.index.name = "geo"
+    return names.set_index("geo").join(df, how="right").reset_index()
@@ -0,0 +1,322 @@
+"""
+Validation and planning of batches of `data()` queries before any data is downloaded.
+
+`plan()` normalizes a list of query specs, drops equivalent ones, and checks each against the
+coverage of its sources and their available filters. Metadata lookups are memoized like the public
+metadata functions, so planning again, or running the plan after it, does not repeat them.
+
+Example:
+    >>> import mapineqpy as mi
+    >>> specs = [
+    ...     {"x_source": "CRIM_GEN_REG", "year": year, "level": "2", "x_filters": {"iccs": "ICCS05012", "unit": "NR"}}
+    ...     for year in [2008, 2009, 2010, 2010]
+    ... ]
+    >>> query_plan = mi.plan(specs)
+    >>> print(query_plan)
+    >>> dfs = query_plan.run()
+"""
+
+import json
+
+from mapineqpy.client import get_client
+from mapineqpy.concurrency import _map_concurrent, data_many
+from mapineqpy.config import API_MAX_LIMIT
+from mapineqpy.data import _duplicates_mode, _prepare_query
+from mapineqpy.options import options
+from mapineqpy.source_filters import source_filters
+from mapineqpy.sources import _coverage
+
+_SPEC_KEYS = {
+    "x_source", "y_source", "year", "level", "x_filters", "y_filters", "limit", "page_size", "join", "duplicates"
+}
+
+
+def _normalize(spec):
+    """
+    Return a spec with the defaults of `data()` applied and filters in a canonical order, so that
+    equivalent specs are equal.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Each spec must be a dictionary of arguments for `data()`.")
+    unknown = set(spec) - _SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown arguments: {', '.join(sorted(unknown))}.")
+
+    y_source = spec.get("y_source")
+    join = spec.get("join")
+    if join is None:
+        join = options.get("bivariate_join", "server")
+    if join not in ("server", "local"):
+        raise ValueError("`join` must be one of 'server', 'local'.")
+    normalized = {
+        "x_source": spec.get("x_source"),
+        "y_source": y_source,
+        "year": spec.get("year"),
+        "level": spec.get("level"),
+        "x_filters": dict(sorted((spec.get("x_filters") or {}).items())),
+        "y_filters": dict(sorted((spec.get("y_filters") or {}).items())) if y_source else {},
+        "limit": spec.get("limit", 2500),
+        "page_size": spec.get("page_size", API_MAX_LIMIT),
+        "join": join if y_source else "server",
+        "duplicates": _duplicates_mode(spec.get("duplicates")),
+    }
+    # Raises ValueError on invalid arguments, exactly as `data()` would
+    _prepare_query(
+        normalized["x_source"], y_source, normalized["year"], normalized["level"],
+        normalized["x_filters"], normalized["y_filters"], normalized["limit"], normalized["page_size"],
+    )
+    return normalized
+
+
+def _expected_requests(query):
+    """
+    Number of requests `data()` makes for a query, if its results fill `limit`.
+    """
+    pages = 1 if query["limit"] is None else -(-query["limit"] // query["page_size"])
+    return pages * (2 if query["join"] == "local" else 1)
+
+
+def _check_filters(available, filters, source):
+    """
+    Compare filters with the output of `source_filters()`.
+
+    Returns:
+        tuple: Error messages for unknown fields and values, and warning messages for unspecified
+               fields with several values, which make the API return several values per region.
+    """
+    values = {}
+    for field, value in zip(available["field"], available["value"]):
+        values.setdefault(field, set()).add(str(value))
+
+    errors = []
+    for field, value in filters.items():
+        if field not in values:
+            errors.append(
+                f"Unknown filter field '{field}' for source '{source}'. Available fields: {', '.join(sorted(values))}."
+            )
+        elif str(value) not in values[field]:
+            errors.append(
+                f"Unknown value '{value}' of filter field '{field}' for source '{source}'. "
+                f"Available values: {', '.join(sorted(values[field]))}."
+            )
+    open_fields = sorted(field for field in values if field not in filters and len(values[field]) > 1)
+    warnings = []
+    if open_fields:
+        warnings.append(
+            f"Filter fields with several values not specified for source '{source}': {', '.join(open_fields)}. "
+            "The API may return several values per region."
+        )
+    return errors, warnings
+
+
+class QueryPlan:
+    """
+    Execution plan of a batch of `data()` queries, as returned by `plan()`.
+
+    Attributes:
+        specs (list of dict): The specs, as given.
+        queries (list of dict): The distinct valid queries, normalized, in order of first appearance.
+        indices (list of int or None): Position in `queries` of each spec, None for invalid specs.
+        issues (list of dict): Problems found, each with the `index` of the spec, a `severity`
+                               ("error" for specs that cannot be run, "warning" otherwise) and a `message`.
+        lookups (int): Number of distinct coverage and filter lookups made to validate the specs.
+    """
+
+    def __init__(self, specs, queries, indices, issues, lookups, client):
+        self.specs = specs
+        self.queries = queries
+        self.indices = indices
+        self.issues = issues
+        self.lookups = lookups
+        self.client = client
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue["severity"] == "error"]
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue["severity"] == "warning"]
+
+    def summary(self):
+        """
+        Summarize the plan.
+
+        Returns:
+            dict: Number of specs, distinct queries, duplicate and invalid specs, warnings, and `requests`,
+                  the number of data requests running the plan takes when every query fills its `limit`
+                  (most queries fit in a single request).
+        """
+        invalid = sum(index is None for index in self.indices)
+        return {
+            "specs": len(self.specs),
+            "queries": len(self.queries),
+            "duplicates": len(self.specs) - invalid - len(self.queries),
+            "invalid": invalid,
+            "warnings": len(self.warnings),
+            "requests": sum(_expected_requests(query) for query in self.queries),
+        }
+
+    def __repr__(self):
+        summary = self.summary()
+        lines = [
+            f"QueryPlan: {summary['specs']} specs, {summary['queries']} distinct queries, "
+            f"{summary['duplicates']} duplicates, {summary['invalid']} invalid, "
+            f"up to {summary['requests']} data requests"
+        ]
+        for issue in self.issues:
+            lines.append(f"  spec {issue['index']} ({issue['severity']}): {issue['message']}")
+        return "\n".join(lines)
+
+    def run(self, errors="raise", processes=None):
+        """
+        Fetch the data of the plan, requesting each distinct query once.
+
+        Args:
+            errors (str): "raise" (default) or "return", see `data_many()`.
+            processes (int, optional): Number of worker processes, see `data_many()`. Default is None.
+
+        Returns:
+            list: One DataFrame per spec, in the order of the specs. Duplicate specs get copies of
+                  the same result.
+
+        Raises:
+            ValueError: If any spec is invalid. Check `QueryPlan.errors` first.
+        """
+        if self.errors:
+            raise ValueError(
+                "The plan has invalid specs:\n"
+                + "\n".join(f"  spec {issue['index']}: {issue['message']}" for issue in self.errors)
+            )
+        results = data_many(self.queries, client=self.client, errors=errors, processes=processes)
+        seen = set()
+        aligned = []
+        for index in self.indices:
+            result = results[index]
+            aligned.append(result.copy() if index in seen and hasattr(result, "copy") else result)
+            seen.add(index)
+        return aligned
+
+
+def plan(specs, client=None, check_filters=True):
+    """
+    Validate and deduplicate a batch of `data()` queries without downloading any data.
+
+    Specs are normalized (defaults applied, filters sorted) so that equivalent specs are planned once.
+    Years and levels are checked against `source_coverage()`, and filter fields and values against
+    `source_filters()`, fetched concurrently once per distinct source, year and level. Specs that
+    `data()` would reject, or that would return no data, are reported as errors before any data request.
+
+    Args:
+        specs (list of dict): Query specifications, each a dictionary of keyword arguments for `data()`.
+        client (MapineqClient, optional): Client to use for the lookups, and to run the plan.
+                                          Default is the shared default client.
+        check_filters (bool): Check filters against `source_filters()`. Default is True; set to False
+                              to only check coverage, with one lookup per source.
+
+    Returns:
+        QueryPlan: The plan. Print it for a report, call `summary()` for counts and `run()` to fetch the data.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> query_plan = mi.plan([
+        ...     {"x_source": "TGS00010", "year": 2020, "level": "2",
+        ...      "x_filters": {"isced11": "TOTAL", "unit": "PC", "age": "Y_GE15", "freq": "A"}},
+        ...     {"x_source": "TGS00010", "year": 2020, "level": "2",
+        ...      "x_filters": {"freq": "A", "age": "Y_GE15", "unit": "PC", "isced11": "TOTAL"}},
+        ... ])
+        >>> query_plan.summary()["queries"]
+        1
+    """
+    if not isinstance(specs, (list, tuple)):
+        raise ValueError("`specs` must be a list of dictionaries of arguments for `data()`.")
+    if client is None:
+        client = get_client()
+
+    issues = []
+    normalized = [None] * len(specs)
+    for i, spec in enumerate(specs):
+        try:
+            normalized[i] = _normalize(spec)
+        except ValueError as e:
+            issues.append({"index": i, "severity": "error", "message": str(e)})
+
+    # Coverage of every source, one lookup each
+    source_names = list(dict.fromkeys(
+        source for query in normalized if query is not None
+        for source in (query["x_source"], query["y_source"]) if source
+    ))
+    coverages = dict(zip(source_names, _map_concurrent(
+        _coverage, [{"source_name": source, "client": client} for source in source_names], errors="return"
+    )))
+
+    def add_error(i, message):
+        issues.append({"index": i, "severity": "error", "message": message})
+        normalized[i] = None
+
+    for i, query in enumerate(normalized):
+        if query is None:
+            continue
+        for source in (query["x_source"], query["y_source"]):
+            if not source:
+                continue
+            covered = coverages[source]
+            if isinstance(covered, Exception):
+                add_error(i, f"Coverage of source '{source}' could not be fetched: {covered}")
+            elif not covered:
+                add_error(i, f"Source '{source}' has no coverage. You can search sources by running:\n"
+                             f"  mi.sources(level='2')")
+            elif query["year"] not in covered.get(query["level"], set()):
+                years = sorted(covered.get(query["level"], set()))
+                add_error(i, f"Source '{source}' has no data for year {query['year']} at level {query['level']}. "
+                             f"Years covered at this level: {', '.join(map(str, years)) or 'none'}.")
+            else:
+                continue
+            break
+
+    # Available filters of every source, year and level still planned, one lookup each
+    filter_keys = []
+    if check_filters:
+        filter_keys = list(dict.fromkeys(
+            (source, query["year"], query["level"]) for query in normalized if query is not None
+            for source in (query["x_source"], query["y_source"]) if source
+        ))
+        available = dict(zip(filter_keys, _map_concurrent(
+            source_filters.__wrapped__,
+            [{"source_name": source, "year": year, "level": level, "client": client}
+             for source, year, level in filter_keys],
+            errors="return",
+        )))
+        for i, query in enumerate(normalized):
+            if query is None:
+                continue
+            for source, filters in ((query["x_source"], query["x_filters"]), (query["y_source"], query["y_filters"])):
+                if not source:
+                    continue
+                filters_frame = available[(source, query["year"], query["level"])]
+                if isinstance(filters_frame, Exception):
+                    add_error(i, f"Filters of source '{source}' could not be fetched: {filters_frame}")
+                    break
+                errors, warnings = _check_filters(filters_frame, filters, source)
+                if errors:
+                    for message in errors:
+                        add_error(i, message)
+                    break
+                if query["duplicates"] == "raise":
+                    issues.extend({"index": i, "severity": "warning", "message": message} for message in warnings)
+
+    # Equivalent specs share one query
+    queries = {}
+    indices = []
+    for query in normalized:
+        if query is None:
+            indices.append(None)
+            continue
+        key = json.dumps(query, sort_keys=True, default=str)
+        indices.append(queries.setdefault(key, (len(queries), query))[0])
+
+    issues.sort(key=lambda issue: issue["index"])
+    return QueryPlan(
+        list(specs), [query for _, query in queries.values()], indices, issues,
+        len(source_names) + len(filter_keys), client,
+    )
@@ -0,0 +1,150 @@
+import email.utils
+import random
+import threading
+import time
+
+from mapineqpy.options import options
+
+# Status codes signalling a transient server condition worth retrying
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class RetryPolicy:
+    """
+    Retry policy for transient API errors, using exponential backoff with full jitter.
+
+    A request is retried on connection errors, timeouts and responses with status 429, 500, 502,
+    503 or 504. The delay before retry `n` (starting at 0) is drawn uniformly between 0 and
+    `min(backoff_max, backoff_factor * 2 ** n)`, and is never shorter than a `Retry-After` header.
+    If `Retry-After` asks for a longer wait than `backoff_max`, the request is not retried and the
+    error is raised.
+
+    Args:
+        retries (int): Maximum number of retries after the first attempt. Default is 3.
+        backoff_factor (float): Base delay in seconds. Default is 0.5.
+        backoff_max (float): Maximum delay in seconds, including delays asked for by `Retry-After`. Default is 60.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> client = mi.MapineqClient(retry=mi.RetryPolicy(retries=5, backoff_factor=1))
+    """
+
+    def __init__(self, retries=3, backoff_factor=0.5, backoff_max=60):
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError("`retries` must be a non-negative integer.")
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+
+    def __repr__(self):
+        return (
+            f"RetryPolicy(retries={self.retries}, backoff_factor={self.backoff_factor}, "
+            f"backoff_max={self.backoff_max})"
+        )
+
+    def delay(self, attempt, response=None):
+        """
+        Return the number of seconds to wait before retry number `attempt` (starting at 0), or None
+        if the `Retry-After` header of `response` exceeds `backoff_max` and the request should not be retried.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            if retry_after > self.backoff_max:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _retry_after(response):
+    """
+    Parse the `Retry-After` header of a response, given in seconds or as an HTTP date.
+    """
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting the rate of requests.
+
+    Shared by all threads (and therefore by async tasks and bulk functions, which run requests on threads).
+
+    Args:
+        rate (float): Sustained number of requests per second.
+        burst (int, optional): Maximum number of requests that can be sent at once after an idle
+                               period. Default is None, meaning `max(1, int(rate))`.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> client = mi.MapineqClient(rate_limit=mi.RateLimiter(5))
+    """
+
+    def __init__(self, rate, burst=None):
+        if not rate or rate <= 0:
+            raise ValueError("`rate` must be a positive number.")
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RateLimiter(rate={self.rate}, burst={self.burst})"
+
+    def acquire(self):
+        """
+        Block until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_retry_policy():
+    """
+    Return a retry policy built from `mi.options["retries"]`, `["backoff_factor"]` and `["backoff_max"]`.
+    """
+    return RetryPolicy(
+        retries=options.get("retries", 3),
+        backoff_factor=options.get("backoff_factor", 0.5),
+        backoff_max=options.get("backoff_max", 60),
+    )
+
+
+def get_rate_limiter():
+    """
+    Return the rate limiter shared by all clients, configured by `mi.options["rate_limit"]`
+    (requests per second), or None if it is not set.
+    """
+    global _rate_limiter
+    rate = options.get("rate_limit")
+    if not rate:
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter.rate != float(rate):
+            _rate_limiter = RateLimiter(rate)
+        return _rate_limiter
@@ -0,0 +1,57 @@
+import threading
+
+from mapineqpy.options import options
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls: while a call for a key is in flight, later callers with
+    the same key wait for it and receive its result (or exception) instead of repeating the work.
+
+    Results are shared between callers, so they must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Call `func(*args, **kwargs)`, unless a call with the same key is already in flight.
+        """
+        if not options.get("coalesce", True):
+            return func(*args, **kwargs)
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Shared by all data and metadata requests of the package
+single_flight = SingleFlight()
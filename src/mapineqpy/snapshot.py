@@ -0,0 +1,180 @@
+import contextlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from mapineqpy.cache import cache_key
+from mapineqpy.options import options
+
+# File layout: MAGIC, zlib-compressed response bodies one after another, a JSON index of
+# key -> [offset, length, function_name, params], and a footer with the index offset and length.
+MAGIC = b"MAPINEQ1"
+_FOOTER = struct.Struct("<QQ")
+
+_recorder = None
+_recorder_lock = threading.Lock()
+_replay = None
+_replay_lock = threading.Lock()
+
+
+def snapshot_key(function_name, params=None):
+    """
+    Key of a response in a snapshot. Independent of the API base URL, so snapshots are portable.
+    """
+    return cache_key(function_name, params)
+
+
+class SnapshotWriter:
+    """
+    Write API responses into a single compressed snapshot file.
+
+    Args:
+        path (str): Snapshot file to create. An existing file is overwritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def add(self, function_name, params, body):
+        """
+        Store the raw body of a response. Responses already recorded are not stored again.
+        """
+        key = snapshot_key(function_name, params)
+        compressed = zlib.compress(body)
+        with self._lock:
+            if key in self._index:
+                return
+            offset = self._file.tell()
+            self._file.write(compressed)
+            self._index[key] = [
+                offset,
+                len(compressed),
+                function_name,
+                {str(k): str(v) for k, v in (params or {}).items()},
+            ]
+
+    def close(self):
+        """
+        Write the index and close the file.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            index = json.dumps(self._index, separators=(",", ":")).encode("utf-8")
+            offset = self._file.tell()
+            self._file.write(index)
+            self._file.write(_FOOTER.pack(offset, len(index)))
+            self._file.close()
+
+
+class Snapshot:
+    """
+    Read-only access to a snapshot file. The file is memory-mapped and bodies are only
+    decompressed when requested, so large snapshots are not loaded in full.
+
+    Args:
+        path (str): Snapshot file written by `record_snapshot()`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"'{path}' is not a valid mapineqpy snapshot.")
+        if self._mmap[: len(MAGIC)] != MAGIC or len(self._mmap) < len(MAGIC) + _FOOTER.size:
+            self.close()
+            raise ValueError(f"'{path}' is not a valid mapineqpy snapshot.")
+        offset, length = _FOOTER.unpack(self._mmap[-_FOOTER.size:])
+        self._index = json.loads(self._mmap[offset: offset + length].decode("utf-8"))
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, function_name, params=None):
+        """
+        Return the raw body recorded for a request, or None if it was not recorded.
+        """
+        entry = self._index.get(snapshot_key(function_name, params))
+        if entry is None:
+            return None
+        offset, length = entry[0], entry[1]
+        return zlib.decompress(self._mmap[offset: offset + length])
+
+    def requests(self):
+        """
+        List the recorded requests as `(function_name, params)` tuples.
+        """
+        return [(entry[2], entry[3]) for entry in self._index.values()]
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+@contextlib.contextmanager
+def record_snapshot(path):
+    """
+    Record every API response made inside the `with` block into a snapshot file.
+
+    Replay the snapshot later, without any network access, by setting `mi.options["replay"]` to its path.
+
+    Args:
+        path (str): Snapshot file to create.
+
+    Example:
+        >>> import mapineqpy as mi
+        >>> with mi.record_snapshot("crime.mapineq"):
+        ...     mi.source_filters("CRIM_GEN_REG", year=2010, level="2")
+        ...     mi.data(x_source="CRIM_GEN_REG", year=2010, level="2", x_filters={"iccs": "ICCS05012"})
+        >>> mi.options["replay"] = "crime.mapineq"
+        >>> mi.data(x_source="CRIM_GEN_REG", year=2010, level="2", x_filters={"iccs": "ICCS05012"})
+    """
+    global _recorder
+    with _recorder_lock:
+        if _recorder is not None:
+            raise ValueError("A snapshot is already being recorded.")
+        _recorder = SnapshotWriter(path)
+    try:
+        yield _recorder
+    finally:
+        with _recorder_lock:
+            recorder, _recorder = _recorder, None
+        recorder.close()
+
+
+def get_recorder():
+    """
+    Return the snapshot being recorded, or None.
+    """
+    return _recorder
+
+
+def get_replay():
+    """
+    Return the snapshot set in `mi.options["replay"]`, or None if replay mode is off.
+    """
+    global _replay
+    path = options.get("replay")
+    if not path:
+        return None
+    with _replay_lock:
+        if _replay is None or _replay.path != path:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Snapshot '{path}' set in `mi.options['replay']` does not exist.")
+            if _replay is not None:
+                _replay.close()
+            _replay = Snapshot(path)
+        return _replay
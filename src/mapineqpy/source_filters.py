@@ -1,10 +1,13 @@
-import requests
 import pandas as pd
 import json
-from mapineqpy.config import BASE_API_ENDPOINT, USER_AGENT
+from mapineqpy.client import get_client
+from mapineqpy.memo import memoize
+from mapineqpy.output import with_output
 
 
-def source_filters(source_name, year, level, filters=None, limit=2500):
+@with_output
+@memoize
+def source_filters(source_name, year, level, filters=None, limit=2500, client=None):
     """
     Fetch possible filtering values for a given source, year, and NUTS level.
 
@@ -15,6 +18,7 @@ def source_filters(source_name, year, level, filters=None, limit=2500):
         filters (dict, optional): A dictionary where the keys are filter fields and
                                   values are the selected filter values. Default is None.
         limit (int): Maximum number of results to fetch. Default is 40.
+        client (MapineqClient, optional): Client to use for the request. Default is the shared default client.
 
     Returns:
         pd.DataFrame: A DataFrame with fields, labels, and their possible values for filtering:
@@ -45,41 +49,28 @@ def source_filters(source_name, year, level, filters=None, limit=2500):
     }
     source_selections_json = json.dumps(source_selections)
 
-    # Prepare API endpoint and parameters
-    endpoint = f"{BASE_API_ENDPOINT}get_column_values_source_json/items.json"
+    if client is None:
+        client = get_client()
+
+    # Prepare API parameters
     query_params = {
         "_resource": source_name,
         "source_selections": source_selections_json,
         "limit": limit,
     }
 
-    # Perform the HTTP GET request
-    response = requests.get(
-        endpoint,
-        headers={"Content-Type": "application/json", "User-Agent": USER_AGENT},
-        params=query_params,
-    )
-    response.raise_for_status()
-
-    # Parse the JSON response
+    # Perform the HTTP GET request, parse the JSON response (as it streams in, with `stream_json`) and
+    # flatten the nested `field_values` straight into columns
+    columns = {"field": [], "field_label": [], "label": [], "value": []}
     try:
-        data = response.json()  # Ensure this handles both list and dict cases
-    except ValueError as e:
-        raise ValueError(f"Failed to parse JSON response: {e}")
-
-    # If the response is already a list, iterate over it directly
-    if isinstance(data, list):
-        records = []
-        for item in data:
-            field = item.get("field")
-            field_label = item.get("field_label")
-            for field_value in item.get("field_values", []):
-                records.append({
-                    "field": field,
-                    "field_label": field_label,
-                    "label": field_value.get("label"),
-                    "value": field_value.get("value"),
-                })
-        return pd.DataFrame(records)
+        for item in client.iter_json("get_column_values_source_json", params=query_params):
+            field_values = item.get("field_values") or []
+            n = len(field_values)
+            columns["field"].extend([item.get("field")] * n)
+            columns["field_label"].extend([item.get("field_label")] * n)
+            columns["label"].extend([field_value.get("label") for field_value in field_values])
+            columns["value"].extend([field_value.get("value") for field_value in field_values])
+    except AttributeError:
+        raise ValueError("Unexpected response format from the API.")
 
-    raise ValueError("Unexpected response format from the API.")
+    return pd.DataFrame(columns)
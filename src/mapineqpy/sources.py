@@ -1,9 +1,12 @@
-import requests
 import pandas as pd
-from mapineqpy.config import BASE_API_ENDPOINT, USER_AGENT
+from mapineqpy.client import get_client
+from mapineqpy.memo import memoize
+from mapineqpy.output import with_output
 
 
-def sources(level, year=None, limit=2500):
+@with_output
+@memoize
+def sources(level, year=None, limit=2500, client=None):
     """
     Get a list of available data sources.
 
@@ -11,6 +14,7 @@ def sources(level, year=None, limit=2500):
         level (str): A string specifying the NUTS level ("0", "1", "2", "3").
         year (int, optional): An integer specifying the year. Default is None.
         limit (int): Maximum number of results to fetch. Default is 2500.
+        client (MapineqClient, optional): Client to use for the request. Default is the shared default client.
 
     Returns:
         pd.DataFrame: A DataFrame with source metadata, containing:
@@ -27,23 +31,19 @@ def sources(level, year=None, limit=2500):
     if not isinstance(limit, int) or limit < 1:
         raise ValueError("`limit` must be a positive integer.")
 
-    endpoint = (
-        f"{BASE_API_ENDPOINT}get_source_by_nuts_level/items.json"
+    if client is None:
+        client = get_client()
+
+    function_name = (
+        "get_source_by_nuts_level"
         if year is None
-        else f"{BASE_API_ENDPOINT}get_source_by_year_nuts_level/items.json"
+        else "get_source_by_year_nuts_level"
     )
     query_params = {"_level": level, "limit": limit}
     if year is not None:
         query_params["_year"] = year
 
-    response = requests.get(
-        endpoint,
-        headers={"Content-Type": "application/json", "User-Agent": USER_AGENT},
-        params=query_params,
-    )
-    response.raise_for_status()
-
-    data = response.json()
+    data = client.get_json(function_name, params=query_params)
     df = pd.DataFrame(data)
     df.rename(
         columns={
@@ -55,13 +55,16 @@ def sources(level, year=None, limit=2500):
     )
     return df[["source_name", "short_description", "description"]]
 
-def source_coverage(source_name, limit=2500):
+@with_output
+@memoize
+def source_coverage(source_name, limit=2500, client=None):
     """
     Get the NUTS level and Year coverage for a specific data source.
 
     Args:
         source_name (str): The name of the data source.
         limit (int): Maximum number of results to fetch. Default is 2500.
+        client (MapineqClient, optional): Client to use for the request. Default is the shared default client.
 
     Returns:
         pd.DataFrame: A DataFrame with coverage metadata:
@@ -74,17 +77,13 @@ def source_coverage(source_name, limit=2500):
     Example:
         >>> mi_source_coverage("BD_HGNACE2_R3")
     """
-    endpoint = f"{BASE_API_ENDPOINT}get_year_nuts_level_from_source/items.json"
-    query_params = {"_resource": source_name, "limit": limit}
-    response = requests.get(
-        endpoint,
-        headers={"Content-Type": "application/json", "User-Agent": USER_AGENT},
-        params=query_params,
-    )
-    response.raise_for_status()
+    if client is None:
+        client = get_client()
 
-    data = response.json()
-    df = pd.DataFrame(data)
+    query_params = {"_resource": source_name, "limit": limit}
+    data = client.get_json("get_year_nuts_level_from_source", params=query_params)
+    # Explicit columns, so that unknown sources give an empty frame instead of a KeyError
+    df = pd.DataFrame(data, columns=["f_level", "f_year"])
     df.rename(
         columns={
             "f_level": "nuts_level",
@@ -100,3 +99,14 @@ def source_coverage(source_name, limit=2500):
     return df[
         ["nuts_level", "year", "source_name", "short_description", "description"]
     ]
+
+
+def _coverage(source_name, client):
+    """
+    Return the years covered by a source as a dictionary of sets keyed by NUTS level.
+    """
+    coverage = source_coverage.__wrapped__(source_name, client=client)
+    covered = {}
+    for level, year in zip(coverage["nuts_level"].astype(str), coverage["year"]):
+        covered.setdefault(level, set()).add(int(year))
+    return covered
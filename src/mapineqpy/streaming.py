@@ -0,0 +1,93 @@
+import codecs
+import json
+import re
+
+_decoder = json.JSONDecoder()
+# The C scanner behind `json.loads`, called directly to avoid per-element wrapper overhead
+_scan_once = _decoder.scan_once
+_skip_whitespace = re.compile(r"[ \t\n\r]*").match
+
+
+def iter_json_array(chunks):
+    """
+    Parse a JSON array incrementally from an iterable of byte chunks, yielding one element at a time.
+
+    Only the unparsed tail of the body is kept in memory, so a large response never has to be held
+    in full, neither as text nor as a list of Python objects.
+
+    Args:
+        chunks (iterable of bytes): UTF-8 encoded body, e.g. `response.iter_content(65536)`.
+
+    Yields:
+        The elements of the array, decoded with the standard `json` module.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    exhausted = False
+    chunks = iter(chunks)
+
+    while True:
+        # Parse as many complete elements as the buffer holds
+        while True:
+            pos = _skip_whitespace(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError("Failed to parse JSON response: expected an array.")
+                started = True
+                pos += 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                pos += 1
+                continue
+            try:
+                item, end = _scan_once(buffer, pos)
+            except (StopIteration, json.JSONDecodeError):
+                break  # Incomplete element, read more
+            if end >= len(buffer) and not exhausted:
+                break  # A number at the end of the buffer may continue in the next chunk
+            pos = end
+            yield item
+
+        if exhausted:
+            raise ValueError("Failed to parse JSON response: invalid or truncated array.")
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            exhausted = True
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+
+def records_to_columns(records):
+    """
+    Collect an iterable of JSON records (dictionaries) into columns.
+
+    Columns appear in the order their keys are first seen. Keys missing from some records are filled with None.
+
+    Returns:
+        tuple: A dictionary of column name to list of values, and the number of records.
+    """
+    columns = {}
+    n = 0
+    for record in records:
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * n
+            elif len(column) < n:
+                column.extend([None] * (n - len(column)))
+            column.append(value)
+        n += 1
+    for column in columns.values():
+        if len(column) < n:
+            column.extend([None] * (n - len(column)))
+    return columns, n
@@ -0,0 +1,45 @@
+import copy
+
+import pytest
+
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+@pytest.fixture(autouse=True)
+def _isolate(tmp_path):
+    """
+    Restore options and empty the in-memory caches after each test.
+    """
+    saved = copy.deepcopy(mi.options)
+    mi.options["cache_dir"] = str(tmp_path / "cache")
+    yield
+    mi.options.clear()
+    mi.options.update(saved)
+    mi.clear_metadata_cache()
+    mi.clear_geo_lookup()
+
+
+@pytest.fixture
+def server():
+    with MockServer(n_regions=50) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with server.client() as client:
+        yield client
+
+
+@pytest.fixture
+def query(server):
+    """
+    Arguments of a `data()` query returning one row per region.
+    """
+    return {
+        "x_source": server.sources[0],
+        "year": 2015,
+        "level": "2",
+        "x_filters": {"unit": "NR", "freq": "A", "category": "C0"},
+    }
@@ -0,0 +1,23 @@
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+def test_catalog_build_is_incremental(tmp_path):
+    path = str(tmp_path / "catalog.sqlite")
+    with MockServer(n_regions=5, n_sources=3, years=range(2014, 2016)) as server, server.client() as client:
+        summary = mi.catalog.build(path, client=client)
+        assert (summary["sources"], summary["coverage"], summary["filter_requests"]) == (3, 24, 12)
+        assert server.requests["get_column_values_source_json"] == 12
+
+        summary = mi.catalog.build(path, client=client)
+        assert summary["filter_requests"] == 0
+        assert server.requests["get_column_values_source_json"] == 12
+
+        summary = mi.catalog.build(path, filters="all", client=client)
+        assert summary["filter_requests"] == 12
+
+    found = mi.catalog.find_sources("synthetic", path=path)
+    assert found["source_name"].tolist() == server.sources
+    with_field = mi.catalog.sources_with_field("category", "C1", path=path)
+    assert len(with_field) == 24
+    assert mi.catalog.sources_with_field("category", "XX", path=path).empty
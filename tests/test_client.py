@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+@pytest.mark.parametrize("stream_json", [False, True])
+def test_stream_json_same_result(client, query, stream_json):
+    expected = mi.data(**query, client=client)
+    mi.options["stream_json"] = stream_json
+    mi.clear_metadata_cache()
+    pd.testing.assert_frame_equal(mi.data(**query, client=client), expected)
+
+
+def test_stream_json_off_by_default():
+    assert mi.options["stream_json"] is False
+
+
+def test_connection_pool_follows_max_concurrency(query, caplog):
+    mi.options["max_concurrency"] = 32
+    specs = [dict(query, year=year, x_filters=dict(query["x_filters"], category=category))
+             for year in range(2010, 2021) for category in ("C0", "C1", "C2")]
+    with MockServer(n_regions=50, latency=0.05) as server, server.client() as client:
+        mi.data_many(specs, client=client)
+    assert "Connection pool is full" not in caplog.text
@@ -0,0 +1,28 @@
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+class _SparseServer(MockServer):
+    """
+    Mock server without data for category "C1".
+    """
+
+    def respond(self, function_name, query):
+        if function_name == "get_x_data" and '"C1"' in query["X_JSON"]:
+            return []
+        return super().respond(function_name, query)
+
+
+def test_data_without_rows_is_empty():
+    with _SparseServer(n_regions=5) as server, server.client() as client:
+        df = mi.data(server.sources[0], year=2015, level="2", x_filters={"category": "C1"}, client=client)
+    assert df.empty
+    assert list(df.columns) == ["geo", "geo_name", "geo_source", "geo_year", "x_year", "x"]
+
+
+def test_data_combinations_skips_combinations_without_data():
+    with _SparseServer(n_regions=5) as server, server.client() as client:
+        df = mi.data_combinations(server.sources[0], year=2015, level="2", client=client)
+    assert sorted(df["category"].unique()) == ["C0", "C2"]
+    assert len(df) == 10
+    assert {"unit", "freq", "category"} <= set(df.columns)
@@ -0,0 +1,75 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+import mapineqpy as mi
+
+
+def test_data_many_keeps_order(client, query):
+    specs = [dict(query, year=year) for year in (2012, 2015, 2013)]
+    dfs = mi.data_many(specs, client=client)
+    assert [df["x_year"].iloc[0] for df in dfs] == [2012, 2015, 2013]
+
+
+def test_data_many_errors_return(client, query):
+    specs = [query, dict(query, level="9")]
+    with pytest.raises(ValueError):
+        mi.data_many(specs, client=client)
+    df, error = mi.data_many(specs, client=client, errors="return")
+    assert len(df) == 50
+    assert isinstance(error, ValueError)
+
+
+def test_data_many_processes_matches_threads(client, query):
+    specs = [dict(query, year=year) for year in (2012, 2013, 2014)]
+    expected = mi.data_many(specs, client=client)
+    results = mi.data_many(specs, client=client, processes=2)
+    for df, expected_df in zip(results, expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+
+
+def test_processes_convert_output_once(client, query):
+    mi.options.update(dtypes="compact", backend="pyarrow")
+    pytest.importorskip("pyarrow")
+    specs = [dict(query, year=year) for year in (2012, 2013)]
+    expected = mi.data_many(specs, client=client)
+    results = mi.data_many(specs, client=client, processes=2)
+    for df, expected_df in zip(results, expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+
+    requests = [{"source_name": query["x_source"], "year": year, "level": "2"} for year in (2012, 2013)]
+    expected = mi.source_filters_many(requests, client=client)
+    for df, expected_df in zip(mi.source_filters_many(requests, client=client, processes=2), expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+
+
+def test_worker_returns_unconverted_frames(client, query):
+    # Workers leave output conversion to the parent, whatever the options
+    from mapineqpy.concurrency import _client_config, _decode_result, _run_shard
+
+    worker_options = dict(mi.options, dtypes="compact")
+    kwargs = dict(query, client=_client_config(client, 1))
+    [(kind, payload)] = _run_shard("mapineqpy.data", "data", [kwargs], worker_options)
+    df = _decode_result(kind, payload)
+    assert not isinstance(df["geo_source"].dtype, pd.CategoricalDtype)
+    assert df["geo_year"].dtype == "int64"
+
+
+def test_processes_polars_backend(client, query):
+    pl = pytest.importorskip("polars")
+    mi.options["backend"] = "polars"
+    dfs = mi.data_many([query], client=client, processes=2)
+    assert isinstance(dfs[0], pl.DataFrame)
+
+
+def test_adata_returns_results_in_order(client, query):
+    years = [2018, 2012, 2015, 2010]
+
+    async def main():
+        return await asyncio.gather(*[mi.adata(**dict(query, year=year), client=client) for year in years])
+
+    results = asyncio.run(main())
+    assert [df["x_year"].iloc[0] for df in results] == years
+    for year, df in zip(years, results):
+        pd.testing.assert_frame_equal(df, mi.data(**dict(query, year=year), client=client))
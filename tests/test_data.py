@@ -0,0 +1,150 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+class _PartialServer(MockServer):
+    """
+    Mock server where the second source only has data for the first regions.
+    """
+
+    def respond(self, function_name, query):
+        items = super().respond(function_name, query)
+        if function_name == "get_x_data" and self.sources[1] in query["X_JSON"]:
+            items = items[:3]
+        if function_name == "get_xy_data":
+            y_items = self.respond("get_x_data", {"_year": query["_outcome_year"], "_level": query["_level"],
+                                                  "X_JSON": query["Y_JSON"]})
+            y_values = {item["geo"]: item["x"] for item in y_items}
+            items = [dict(item, y=y_values.get(item["geo"])) for item in items]
+        return items
+
+
+def test_local_join_matches_server():
+    with _PartialServer(n_regions=5) as server, server.client() as client:
+        filters = {"unit": "NR", "freq": "A", "category": "C0"}
+        query = dict(
+            x_source=server.sources[0], y_source=server.sources[1], year=2015, level="2",
+            x_filters=filters, y_filters=filters,
+        )
+        expected = mi.data(**query, join="server", client=client)
+        df = mi.data(**query, join="local", client=client)
+    assert len(expected) == 5
+    assert expected["y"].isna().sum() == 2
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.parametrize("page_size", [7, 50, 10000])
+def test_paging_returns_all_rows_in_order(client, query, page_size):
+    expected = mi.data(**query, client=client)
+    df = mi.data(**query, limit=None, page_size=page_size, client=client)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_limit_across_pages(client, query):
+    df = mi.data(**query, limit=23, page_size=10, client=client)
+    assert len(df) == 23
+
+
+def test_iter_data_chunks(client, query):
+    chunks = list(mi.iter_data(**query, page_size=20, client=client))
+    assert [len(chunk) for chunk in chunks] == [20, 20, 10]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), mi.data(**query, client=client))
+
+
+def test_duplicates_raise_lists_missing_filters(client, query):
+    query = dict(query, x_filters={"unit": "NR"})
+    with pytest.raises(ValueError, match="category"):
+        mi.data(**query, client=client)
+
+
+@pytest.mark.parametrize("duplicates, rows", [("first", 50), ("mean", 50), ("keep", 150)])
+def test_duplicates_modes(client, query, duplicates, rows):
+    query = dict(query, x_filters={"unit": "NR"})
+    df = mi.data(**query, duplicates=duplicates, client=client)
+    assert len(df) == rows
+    assert mi.find_duplicates(df).empty == (duplicates != "keep")
+    if duplicates == "mean":
+        kept = mi.data(**query, duplicates="keep", client=client)
+        assert df["x"].tolist() == pytest.approx(kept.groupby("geo", sort=False)["x"].mean().tolist())
+
+
+def test_cache_round_trip(server, client, query):
+    mi.options["cache"] = True
+    expected = mi.data(**query, client=client)
+    served = server.requests["get_x_data"]
+    pd.testing.assert_frame_equal(mi.data(**query, client=client), expected)
+    assert server.requests["get_x_data"] == served
+
+
+def test_filter_order_does_not_change_the_request(server, client, query):
+    mi.options["cache"] = True
+    expected = mi.data(**query, client=client)
+    reordered = dict(query, x_filters=dict(reversed(query["x_filters"].items())))
+    pd.testing.assert_frame_equal(mi.data(**reordered, client=client), expected)
+    assert server.requests["get_x_data"] == 1
+
+
+def test_snapshot_replay_round_trip(tmp_path, server, client, query):
+    path = str(tmp_path / "snapshot.mapineq")
+    with mi.record_snapshot(path):
+        expected = mi.data(**query, client=client)
+    mi.options["replay"] = path
+    served = dict(server.requests)
+    pd.testing.assert_frame_equal(mi.data(**query, client=client), expected)
+    assert dict(server.requests) == served
+    with pytest.raises(ValueError, match="not in the snapshot"):
+        mi.data(**dict(query, year=2016), client=client)
+
+
+def test_retry_on_503(query):
+    mi.options["backoff_factor"] = 0
+    with MockServer(n_regions=50, error_rate=0.5, seed=1) as server, server.client() as client:
+        mi.options["retries"] = 10
+        for year in range(2010, 2016):
+            assert len(mi.data(**dict(query, year=year), client=client)) == 50
+        assert server.requests["get_x_data"] > 6
+        mi.options["retries"] = 0
+        with pytest.raises(Exception, match="503"):
+            for year in range(2010, 2021):
+                mi.data(**dict(query, year=year), client=client)
+
+
+def test_identical_concurrent_requests_are_coalesced(query):
+    with MockServer(n_regions=50, latency=0.2) as server, server.client() as client:
+        barrier = threading.Barrier(4)
+        results = []
+
+        def fetch():
+            barrier.wait()
+            results.append(mi.data(**query, client=client))
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert server.requests["get_x_data"] == 1
+    assert len(results) == 4
+    for df in results[1:]:
+        pd.testing.assert_frame_equal(df, results[0])
+
+
+@pytest.mark.parametrize("duplicates", ["first", "mean", "keep"])
+@pytest.mark.parametrize("page_size", [1, 4, 10000])
+def test_iter_data_duplicates_across_pages(client, query, duplicates, page_size):
+    query = dict(query, x_filters={"unit": "NR"})
+    expected = mi.data(**query, duplicates=duplicates, limit=None, client=client)
+    chunks = list(mi.iter_data(**query, duplicates=duplicates, page_size=page_size, client=client))
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+
+@pytest.mark.parametrize("page_size", [1, 4])
+def test_iter_data_raises_on_duplicates_across_pages(client, query, page_size):
+    query = dict(query, x_filters={"unit": "NR"})
+    with pytest.raises(ValueError, match="category"):
+        list(mi.iter_data(**query, page_size=page_size, client=client))
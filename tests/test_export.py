@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+
+import mapineqpy as mi
+from mapineqpy.export import export, sync
+from mapineqpy.mock_server import MockServer
+
+pytest.importorskip("pyarrow")
+
+
+class _FlakyServer(MockServer):
+    """
+    Mock server failing data requests for the years in `failing`.
+    """
+
+    failing = set()
+
+    def respond(self, function_name, query):
+        if function_name == "get_x_data" and int(query["_year"]) in self.failing:
+            raise ValueError("unavailable")
+        return super().respond(function_name, query)
+
+
+@pytest.fixture
+def flaky():
+    with _FlakyServer(n_regions=20, years=range(2010, 2014)) as server:
+        yield server
+
+
+def _spec(server):
+    return {
+        "queries": [
+            {"x_source": server.sources[0], "levels": "2", "x_filters": {"unit": "NR", "freq": "A", "category": "C0"}}
+        ]
+    }
+
+
+def _files(output):
+    return sorted(
+        os.path.relpath(os.path.join(root, name), output)
+        for root, _, names in os.walk(output) for name in names if name.endswith(".parquet")
+    )
+
+
+def test_export_resumes_failed_requests(tmp_path, flaky):
+    output = str(tmp_path / "export")
+    flaky.failing = {2012}
+    with flaky.client() as client:
+        summary = export(_spec(flaky), output=output, progress=False, client=client)
+        assert (summary["planned"], summary["completed"], summary["failed"]) == (4, 3, 1)
+
+        flaky.failing = set()
+        served = flaky.requests["get_x_data"]
+        summary = export(_spec(flaky), output=output, progress=False, client=client)
+        assert (summary["skipped"], summary["completed"], summary["failed"]) == (3, 1, 0)
+        assert flaky.requests["get_x_data"] == served + 1
+
+    files = _files(output)
+    assert len(files) == 4
+    df = pd.read_parquet(os.path.join(output, files[0]))
+    assert len(df) == 20
+
+
+def test_sync_fetches_new_and_changed(tmp_path, flaky):
+    output = str(tmp_path / "export")
+    with flaky.client() as client:
+        export(_spec(flaky), output=output, progress=False, client=client)
+
+        summary = sync(_spec(flaky), output=output, progress=False, client=client)
+        assert (summary["new"], summary["changed"], summary["unchanged"]) == (0, 0, 4)
+
+        flaky.years.append(2014)
+        flaky.version += 1
+        summary = sync(_spec(flaky), output=output, progress=False, client=client)
+        assert (summary["new"], summary["changed"], summary["unchanged"]) == (1, 4, 0)
+    assert len(_files(output)) == 5
+
+
+def test_sync_bypasses_the_cache_for_its_own_requests(tmp_path, flaky):
+    mi.options["cache"] = True
+    output = str(tmp_path / "export")
+    bypass = []
+    respond = flaky.respond
+
+    def recording_respond(function_name, query):
+        bypass.append(mi.options["cache_bypass"])
+        return respond(function_name, query)
+
+    flaky.respond = recording_respond
+    with flaky.client() as client:
+        export(_spec(flaky), output=output, progress=False, client=client)
+        flaky.version += 1
+        summary = sync(_spec(flaky), output=output, progress=False, client=client)
+        assert summary["changed"] == 4
+        assert bypass and not any(bypass)
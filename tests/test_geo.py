@@ -0,0 +1,46 @@
+import pandas as pd
+
+import mapineqpy as mi
+
+
+def test_geo_lookup_mode(server, client, query):
+    expected = mi.data(**dict(query, year=2016), client=client)
+    mi.options["geo_metadata"] = "lookup"
+    with mi.collect_stats() as stats:
+        mi.data(**query, client=client)
+        df = mi.data(**dict(query, year=2016), client=client)
+    assert list(df.columns) == ["geo", "geo_year", "x_year", "x"]
+    assert [event["params"].get("properties") for event in stats.requests] == [None, "geo,geo_year,data_year,x"]
+    merged = df.merge(mi.geo_lookup(), on=["geo", "geo_year"])
+    pd.testing.assert_frame_equal(merged[expected.columns], expected)
+
+
+def test_compression_counts_wire_bytes(client, query):
+    with mi.collect_stats() as stats:
+        mi.data(**query, client=client)
+    summary = stats.summary()
+    assert summary["encoding"] == {"gzip": 1}
+    assert summary["wire_bytes"] < summary["bytes"]
+
+    mi.options["compression"] = False
+    with mi.collect_stats() as stats:
+        mi.data(**dict(query, year=2016), client=client)
+    summary = stats.summary()
+    assert summary["encoding"] == {"identity": 1}
+    assert summary["wire_bytes"] == summary["bytes"]
+
+
+def test_iter_data_in_geo_lookup_mode(client, query):
+    expected = mi.data(**dict(query, year=2016), client=client)
+    mi.options["geo_metadata"] = "lookup"
+    mi.data(**dict(query, limit=20), client=client)
+    with mi.collect_stats() as stats:
+        chunks = list(mi.iter_data(**dict(query, year=2016), page_size=20, client=client))
+    # Pages with regions not seen yet are requested again in full
+    properties = [event["params"].get("properties") for event in stats.requests]
+    assert properties.count("geo,geo_year,data_year,x") == 3
+    assert properties.count(None) == 2
+    df = pd.concat(chunks, ignore_index=True)
+    assert list(df.columns) == ["geo", "geo_year", "x_year", "x"]
+    merged = df.merge(mi.geo_lookup(), on=["geo", "geo_year"])
+    pd.testing.assert_frame_equal(merged[expected.columns], expected)
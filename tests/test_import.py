@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+
+import mapineqpy
+
+# Budget for `import mapineqpy`, best of several fresh interpreters
+IMPORT_BUDGET_MS = 30
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import mapineqpy as mi
+elapsed = time.perf_counter() - started
+loaded = [name for name in ("pandas", "requests") if name in sys.modules]
+mi.nuts_levels, mi.options, mi.MapineqClient
+loaded_after_lookup = [name for name in ("pandas", "requests") if name in sys.modules]
+print(json.dumps({"seconds": elapsed, "loaded": loaded, "loaded_after_lookup": loaded_after_lookup}))
+"""
+
+
+def _probe():
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(mapineqpy.__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_does_not_load_pandas_or_requests():
+    result = _probe()
+    assert result["loaded"] == []
+    assert result["loaded_after_lookup"] == []
+
+
+def test_import_time_within_budget():
+    best = min(_probe()["seconds"] for _ in range(5)) * 1000
+    assert best <= IMPORT_BUDGET_MS, f"import mapineqpy took {best:.1f} ms, budget {IMPORT_BUDGET_MS} ms"
@@ -0,0 +1,41 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+@pytest.mark.parametrize("memoize", [True, False])
+def test_concurrent_identical_calls_share_a_request(query, memoize):
+    mi.options["memoize"] = memoize
+    with MockServer(n_regions=50, latency=0.2) as server, server.client() as client:
+        barrier = threading.Barrier(4)
+        results = []
+
+        def fetch():
+            barrier.wait()
+            results.append(mi.source_filters(query["x_source"], 2015, "2", client=client))
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert server.requests["get_column_values_source_json"] == 1
+    for df in results[1:]:
+        pd.testing.assert_frame_equal(df, results[0])
+
+
+def test_duplicate_check_looks_up_filters_once_per_key(server, client, query):
+    query = dict(query, x_filters={"unit": "NR"})
+    for year in (2015, 2016, 2015, 2016):
+        with pytest.raises(ValueError, match="category"):
+            mi.data(**dict(query, year=year), client=client)
+    assert server.requests["get_column_values_source_json"] == 2
+
+    mi.clear_metadata_cache("source_filters")
+    with pytest.raises(ValueError, match="category"):
+        mi.data(**query, client=client)
+    assert server.requests["get_column_values_source_json"] == 3
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+import mapineqpy as mi
+
+
+def test_panel_skips_uncovered_years(server, client, query):
+    df = mi.panel(query["x_source"], years=[2008, 2015, 2016], level="2", x_filters=query["x_filters"], client=client)
+    assert server.requests["get_x_data"] == 2
+    assert list(df.columns) == ["year", *mi.data(**query, client=client).columns]
+    assert df["year"].tolist() == [2015] * 50 + [2016] * 50
+
+    with pytest.raises(ValueError, match="No requested years are covered"):
+        mi.panel(query["x_source"], years=[2005], level="2", x_filters=query["x_filters"], client=client)
+
+
+def test_panel_wide_matches_long(client, query):
+    kwargs = {"years": [2015, 2016], "level": "2", "x_filters": query["x_filters"], "client": client}
+    long = mi.panel(query["x_source"], **kwargs)
+    wide = mi.panel(query["x_source"], shape="wide", **kwargs)
+    assert list(wide.columns) == ["geo", "geo_name", "x_2015", "x_2016"]
+    assert len(wide) == 50
+    expected = long.pivot(index="geo", columns="year", values="x")
+    for year in (2015, 2016):
+        pd.testing.assert_series_equal(
+            wide.set_index("geo").loc[expected.index, f"x_{year}"], expected[year].rename(f"x_{year}"), check_names=False
+        )
@@ -0,0 +1,32 @@
+import pandas as pd
+
+import mapineqpy as mi
+
+
+def test_plan_dedupes_and_validates(server, client, query):
+    specs = [
+        query,
+        dict(query, x_filters=dict(reversed(list(query["x_filters"].items())))),
+        dict(query, level=2),
+        dict(query, year=1990),
+        dict(query, x_source="UNKNOWN"),
+        dict(query, x_filters=dict(query["x_filters"], unit="XX")),
+        dict(query, x_filters={"unit": "NR"}),
+        dict(query, level="9"),
+    ]
+    served = server.requests["get_x_data"]
+    plan = mi.plan(specs, client=client)
+    assert "Invalid `level`: 2" in plan.errors[0]["message"]
+    assert server.requests["get_x_data"] == served
+    assert plan.summary() == {
+        "specs": 8, "queries": 2, "duplicates": 1, "invalid": 5, "warnings": 1, "requests": 2,
+    }
+    assert plan.indices == [0, 0, None, None, None, None, 1, None]
+
+
+def test_plan_run_aligns_results(client, query):
+    plan = mi.plan([query, dict(query, year=2016), query], client=client)
+    first, second, third = plan.run()
+    pd.testing.assert_frame_equal(first, third)
+    assert first is not third
+    assert second["x_year"].iloc[0] == 2016
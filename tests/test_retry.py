@@ -0,0 +1,22 @@
+import types
+
+import mapineqpy as mi
+
+
+def _response(retry_after):
+    return types.SimpleNamespace(headers={"Retry-After": retry_after})
+
+
+def test_retry_after_is_honoured_in_full():
+    policy = mi.RetryPolicy(backoff_factor=0, backoff_max=60)
+    assert policy.delay(0, _response("30")) == 30
+
+
+def test_retry_after_over_backoff_max_gives_up():
+    policy = mi.RetryPolicy(backoff_factor=0, backoff_max=60)
+    assert policy.delay(0, _response("120")) is None
+
+
+def test_backoff_is_bounded():
+    policy = mi.RetryPolicy(backoff_factor=1, backoff_max=2)
+    assert all(0 <= policy.delay(attempt) <= 2 for attempt in range(10))
@@ -0,0 +1,34 @@
+import threading
+
+import pandas as pd
+
+import mapineqpy as mi
+from mapineqpy.mock_server import MockServer
+
+
+def test_memoized_metadata_is_recorded(tmp_path, server, client, query):
+    path = str(tmp_path / "snapshot.mapineq")
+    expected = mi.source_filters(query["x_source"], 2015, "2", client=client)
+    with mi.record_snapshot(path):
+        mi.source_filters(query["x_source"], 2015, "2", client=client)
+    mi.options["replay"] = path
+    mi.clear_metadata_cache()
+    pd.testing.assert_frame_equal(mi.source_filters(query["x_source"], 2015, "2", client=client), expected)
+
+
+def test_coalesced_requests_are_recorded(tmp_path, query):
+    path = str(tmp_path / "snapshot.mapineq")
+    queries = [query, dict(query, year=2016)]
+    with MockServer(n_regions=50, latency=0.1) as server, server.client() as client:
+        with mi.record_snapshot(path):
+            threads = [
+                threading.Thread(target=mi.data, kwargs=dict(q, client=client)) for q in queries for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        expected = [mi.data(**q, client=client) for q in queries]
+    mi.options["replay"] = path
+    for q, df in zip(queries, expected):
+        pd.testing.assert_frame_equal(mi.data(**q, client=client), df)